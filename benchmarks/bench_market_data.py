@@ -0,0 +1,57 @@
+"""
+Throughput benchmark of the offline market data providers.
+
+Writes two years of synthetic daily prices for N symbols to parquet and csv files, then measures the
+`get_historical_prices` requests per second served by each provider, without network access.
+
+Usage:
+    python benchmarks/bench_market_data.py --symbols 50 --requests 500
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "ai_finance_agent_team"))
+
+import tools
+from market_data import LocalFileProvider, SyntheticProvider
+
+
+def throughput(label: str, provider, symbols, requests: int):
+    rng = random.Random(0)
+    with patch.object(tools, "get_market_data_provider", return_value=provider):
+        start = time.perf_counter()
+        for _ in range(requests):
+            tools.get_historical_prices(rng.choice(symbols), rng.choice([1, 3, 6, 12, 24]))
+        elapsed = time.perf_counter() - start
+    print(f"  {label:<20}: {requests / elapsed:8.1f} requests/s ({elapsed / requests * 1000:.2f} ms per request)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=50, help="Number of symbols")
+    parser.add_argument("--requests", type=int, default=500, help="Number of requests per provider")
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    synthetic_provider = SyntheticProvider(end="2025-05-09")
+    print(f"{args.symbols} symbols, {args.requests} requests")
+
+    with tempfile.TemporaryDirectory() as parquet_dir, tempfile.TemporaryDirectory() as csv_dir:
+        for symbol in symbols:
+            prices = synthetic_provider.daily_prices(symbol, "2y")
+            LocalFileProvider.write_parquet(prices, os.path.join(parquet_dir, f"{symbol}.parquet"))
+            prices.to_csv(os.path.join(csv_dir, f"{symbol}.csv"))
+
+        throughput("synthetic", synthetic_provider, symbols, args.requests)
+        throughput("local parquet", LocalFileProvider(parquet_dir), symbols, args.requests)
+        throughput("local csv", LocalFileProvider(csv_dir), symbols, args.requests)
+
+
+if __name__ == "__main__":
+    main()
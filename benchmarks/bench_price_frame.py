@@ -0,0 +1,84 @@
+"""
+Benchmark of the array-backed financial data against the pydantic models.
+
+Compares, for N companies over a long period of daily closing prices, the per-object loops computing the comparison
+metrics of each company from the pydantic models against the aligned frame of `price_frame`.
+
+Usage:
+    python benchmarks/bench_price_frame.py --companies 10 --days 2500
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "ai_finance_agent_team"))
+
+from tools import FinancialDataResponse
+from price_frame import frame_from_json, to_frame, to_financial_data, comparison_summary
+
+
+def make_payload(companies: int, days: int) -> str:
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2015-01-01", periods=days).strftime("%Y-%m-%d").tolist()
+    return FinancialDataResponse.model_validate({"companies_financial_data": [
+        {
+            "company_name": f"Company {i}",
+            "financial_data": [
+                {"date": date, "metrics": {"Close": float(close)}}
+                for date, close in zip(dates, 100 * np.exp(np.cumsum(rng.normal(0, 0.01, days))))
+            ],
+        }
+        for i in range(companies)
+    ]}).model_dump_json()
+
+
+def timed(label: str, function, repeat: int = 5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    print(f"  {label:<45}: {(time.perf_counter() - start) / repeat * 1000:8.2f} ms")
+    return result
+
+
+def pydantic_summary(response: FinancialDataResponse):
+    # Same metrics as comparison_summary, computed with loops over the pydantic objects
+    summary = {}
+    for company in response.companies_financial_data:
+        closes = [day.metrics.Close for day in company.financial_data]
+        day_returns = [closes[i] / closes[i - 1] - 1 for i in range(1, len(closes))]
+        mean = sum(day_returns) / len(day_returns)
+        summary[company.company_name] = {
+            "change_pct": (closes[-1] / closes[0] - 1) * 100,
+            "min_close": min(closes),
+            "max_close": max(closes),
+            "volatility_pct": (sum((r - mean) ** 2 for r in day_returns) / (len(day_returns) - 1)) ** 0.5 * 100,
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--companies", type=int, default=10, help="Number of companies")
+    parser.add_argument("--days", type=int, default=2500, help="Number of days of closing prices per company")
+    args = parser.parse_args()
+
+    payload = make_payload(args.companies, args.days)
+    print(f"{args.companies} companies, {args.days} days")
+
+    response = timed("pydantic: validate JSON", lambda: FinancialDataResponse.model_validate_json(payload))
+    timed("pydantic: comparison summary (loops)", lambda: pydantic_summary(response))
+    timed("pydantic: serialize JSON", lambda: response.model_dump_json())
+
+    frame = timed("frame: build from JSON", lambda: frame_from_json(payload))
+    timed("frame: build from pydantic models", lambda: to_frame(response))
+    timed("frame: comparison summary (vectorized)", lambda: comparison_summary(frame))
+    timed("frame: convert back to pydantic models", lambda: to_financial_data(frame))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Memory benchmark for the report artifact store.
+
+Simulates N concurrent Streamlit sessions that each generate and display a report, and compares the
+memory retained while the sessions show their report when they keep the html code in the session state
+(previous behaviour) against keeping only the report id of a `ReportStore`.
+
+Both cases go through the Streamlit media file manager as the download button does: it keeps the download
+data of every session displaying a report until the next reruns of the session, the store does not remove this copy.
+Not covered: the Streamlit forward message cache, which may also keep the `components.html` payloads
+of the last runs of each session.
+
+Usage:
+    python benchmarks/bench_report_memory.py --sessions 200 --report-kb 500
+"""
+
+import os
+import sys
+import random
+import string
+import argparse
+import tempfile
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "ai_finance_agent_team"))
+
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+from report_store import ReportStore
+
+
+def make_report(session: int, size_kb: int) -> str:
+    # Random words so that the report does not compress unrealistically well
+    rng = random.Random(session)
+    words = []
+    size = 0
+    while size < size_kb * 1024:
+        word = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+        words.append(word)
+        size += len(word) + 1
+    return f"<html><body><h1>Report {session}</h1><p>{' '.join(words)}</p></body></html>"
+
+
+def run_sessions(sessions: int, size_kb: int, workers: int, store: ReportStore = None):
+    """
+        Run the sessions concurrently.
+
+        Returns:
+            The memory (in bytes) retained by the session states, retained by the media file manager, and the peak.
+    """
+    media_file_manager = MediaFileManager(MemoryMediaFileStorage("/media"))
+    session_states = [dict() for _ in range(sessions)]
+
+    def session_run(session: int):
+        html_content = make_report(session, size_kb)
+        if store is None:
+            session_states[session]["report_html"] = html_content
+        else:
+            report_id = store.put(html_content)
+            session_states[session]["report_id"] = report_id
+            # Display the report as the app does, reading it back from the store
+            html_content = store.read(report_id)
+        # Register the download data as `st.download_button` does, under its own widget coordinates
+        media_file_manager.add(
+            html_content.encode(), "text/html", f"session-{session}.download_button",
+            file_name="report.html", is_for_static_download=True,
+        )
+
+    tracemalloc.start()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(session_run, range(sessions)))
+    retained, peak = tracemalloc.get_traced_memory()
+
+    # Release the downloads as the end of the sessions does (the downloadable files are only deleted
+    # by the second cleanup after they are released), what is left is held by the session states
+    media_file_manager.clear_session_refs()
+    media_file_manager.remove_orphaned_files()
+    media_file_manager.remove_orphaned_files()
+    session_retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return session_retained, retained - session_retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100, help="Number of concurrent sessions")
+    parser.add_argument("--report-kb", type=int, default=500, help="Size of each report in KB")
+    parser.add_argument("--workers", type=int, default=16, help="Number of sessions running at the same time")
+    args = parser.parse_args()
+
+    in_memory = run_sessions(args.sessions, args.report_kb, args.workers)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = ReportStore(directory=directory, max_reports=args.sessions)
+        with_store = run_sessions(args.sessions, args.report_kb, args.workers, store=store)
+        disk_bytes = store.total_bytes()
+
+    mb = 1024 * 1024
+    print(f"{args.sessions} sessions, {args.report_kb} KB per report, {args.workers} workers")
+    for label, (session_retained, media_retained, peak) in (
+        ("html kept in session state", in_memory),
+        ("report store (ids only)   ", with_store),
+    ):
+        print(
+            f"  {label} : session state {session_retained / mb:8.2f} MB, media file manager {media_retained / mb:8.2f} MB, "
+            f"total {(session_retained + media_retained) / mb:8.2f} MB, peak {peak / mb:8.2f} MB"
+        )
+    print(f"  report store on disk (gzip): {disk_bytes / mb:8.2f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -1,80 +1,119 @@
+import os
+
 from agno.agent import Agent
-from agno.models.openai import OpenAIChat
 from agno.storage.agent.sqlite import SqliteAgentStorage
-from agno.tools.duckduckgo import DuckDuckGoTools
 
 from tools import *
+from llm_cache import LLMCache, CachedOpenAIChat
+from data_cache import DataCache, cached_tool
+from market_data import get_market_data_provider
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
-# Initialize the agents
+# LLM responses cache, shared by the agents (see LLM_CACHE_MODE for record/replay)
+# The agents working on live data (news, prices) only go through it in record/replay mode
 
-web_agent = Agent(
-    name="Web Agent",
-    role="Search the web for information about companies",
-    model=OpenAIChat(id="gpt-4o"),
-    tools=[DuckDuckGoTools()],
-    instructions=[
-                    "Search the latest news about the company provided",
-                    "If there are more than one company, seach for at most 1 news for each one",
-                    "Summarize the news, include sources urls",
-                    "Give an analysis of the impact that the news could have on the stock price"
-                ],
-    storage=SqliteAgentStorage(table_name="web_agent", db_file="./storage/team_database.db"),
-    structured_outputs=True,
-    response_model=NewsResponse
-)
+llm_cache = LLMCache.from_env()
 
 
-finance_agent = Agent(
-    name="Finance Agent",
-    role="Get financial data",
-    description="Get the historical prices of the companies provided",
-    model=OpenAIChat(id="gpt-4o"),
-    tools=[get_historical_prices],
-    storage=SqliteAgentStorage(table_name="finance_agent", db_file="./storage/team_database.db"),
-    structured_outputs=True,
-    response_model=FinancialDataResponse
-)
+# Tools results caches, refreshed ahead of market open by the warm-up scheduler (see warmup.py)
+# In record/replay mode, the tools results are recorded and replayed with the LLM responses, in the same database,
+# since the results of the tools are part of the next requests to the model
 
+if llm_cache.mode in ("record", "replay"):
+    tools_cache_options = {"mode": llm_cache.mode, "db_file": llm_cache.db_file}
+else:
+    tools_cache_options = {}
 
-dataviz_agent = Agent(
-    name="Data Visualization Agent",
-    role="Create charts in html code",
-    model=OpenAIChat(id="gpt-4o"),
-    instructions=[
-                    "You have to create a chart in html code from the data provided",
-                    "Make sure the chart is well presented, readable and user friendly",
-                    "You can use html, css and javascript to create a beautiful chart"
-    ],
-    storage=SqliteAgentStorage(table_name="dataviz_agent", db_file="./storage/team_database.db"),
-    structured_outputs=True,
-    response_model=ChartDataResponse
-)
+price_cache = DataCache(table_name="prices", ttl=int(os.getenv("PRICE_CACHE_TTL", 12 * 60 * 60)), **tools_cache_options)
+news_cache = DataCache(table_name="news", ttl=int(os.getenv("NEWS_CACHE_TTL", 6 * 60 * 60)), **tools_cache_options)
 
+# The prices are keyed by provider, so that e.g. synthetic prices of a load test are never served to yfinance users
+cached_get_historical_prices = cached_tool(get_historical_prices, price_cache, namespace=lambda: get_market_data_provider().name)
+web_tools = CachedDuckDuckGoTools(cache=news_cache)
 
-frontend_agent = Agent(
-    name="Frontend Agent",
-    role="Create html page to display the final page",
-    model=OpenAIChat(id="gpt-4o"),
-    instructions=[
-                    "You will be provided information and you have to create a beautiful html page to present the report",
-                    "Make sure the page is well presented, readable and user friendly",
-                    "You can use html, css and javascript to create a beautiful page",
-                ],
-    storage=SqliteAgentStorage(table_name="front_end_agent", db_file="./storage/team_database.db"),
-    structured_outputs=True,
-    response_model=FrontEndResponse
-)
+
+# Initialize the agents
+# The factories are used to create independent agents for the concurrent per-company sub-runs (see fan_out.py)
+
+def create_web_agent() -> Agent:
+    return Agent(
+        name="Web Agent",
+        role="Search the web for information about companies",
+        model=CachedOpenAIChat(id="gpt-4o", cache=llm_cache, cache_mode="off"),
+        tools=[web_tools],
+        instructions=[
+                        "Search the latest news about the company provided",
+                        "If there are more than one company, seach for at most 1 news for each one",
+                        "Summarize the news, include sources urls",
+                        "Give an analysis of the impact that the news could have on the stock price"
+                    ],
+        storage=SqliteAgentStorage(table_name="web_agent", db_file="./storage/team_database.db"),
+        structured_outputs=True,
+        response_model=NewsResponse
+    )
+
+web_agent = create_web_agent()
+
+
+def create_finance_agent() -> Agent:
+    return Agent(
+        name="Finance Agent",
+        role="Get financial data",
+        description="Get the historical prices of the companies provided",
+        model=CachedOpenAIChat(id="gpt-4o", cache=llm_cache, cache_mode="off"),
+        tools=[cached_get_historical_prices],
+        storage=SqliteAgentStorage(table_name="finance_agent", db_file="./storage/team_database.db"),
+        structured_outputs=True,
+        response_model=FinancialDataResponse
+    )
+
+finance_agent = create_finance_agent()
+
+
+def create_dataviz_agent() -> Agent:
+    return Agent(
+        name="Data Visualization Agent",
+        role="Create charts in html code",
+        model=CachedOpenAIChat(id="gpt-4o", cache=llm_cache),
+        instructions=[
+                        "You have to create a chart in html code from the data provided",
+                        "Make sure the chart is well presented, readable and user friendly",
+                        "You can use html, css and javascript to create a beautiful chart"
+        ],
+        storage=SqliteAgentStorage(table_name="dataviz_agent", db_file="./storage/team_database.db"),
+        structured_outputs=True,
+        response_model=ChartDataResponse
+    )
+
+dataviz_agent = create_dataviz_agent()
+
+
+def create_frontend_agent() -> Agent:
+    return Agent(
+        name="Frontend Agent",
+        role="Create html page to display the final page",
+        model=CachedOpenAIChat(id="gpt-4o", cache=llm_cache),
+        instructions=[
+                        "You will be provided information and you have to create a beautiful html page to present the report",
+                        "Make sure the page is well presented, readable and user friendly",
+                        "You can use html, css and javascript to create a beautiful page",
+                    ],
+        storage=SqliteAgentStorage(table_name="front_end_agent", db_file="./storage/team_database.db"),
+        structured_outputs=True,
+        response_model=FrontEndResponse
+    )
+
+frontend_agent = create_frontend_agent()
 
 
 manager_agent = Agent(
     team=[web_agent, finance_agent, dataviz_agent, frontend_agent],
     name="Manager Agent (Web + Finance + Data Visualization + Front End)",
-    model=OpenAIChat(id="gpt-4o"),
+    model=CachedOpenAIChat(id="gpt-4o", cache=llm_cache, cache_mode="off"),
     instructions=[
                     "You manage a team of agents that will work together to provide a report about companies stocks",
                     "First, use the web agent to get the latest news about the companies provided",
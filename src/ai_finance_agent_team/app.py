@@ -1,8 +1,13 @@
+import os
 import streamlit as st
 from datetime import datetime
 import streamlit.components.v1 as components
 
 from agent_team import manager_agent
+from report_store import ReportStore, ReportTooLargeError, DEFAULT_MAX_HTML_BYTES
+from warmup import WarmupScheduler
+from fan_out import fan_out_enabled, split_companies, run_fan_out
+from delta import delta_enabled, run_delta, ReportSession
 
 # Page configuration
 st.set_page_config(
@@ -12,6 +17,51 @@ st.set_page_config(
     layout="wide",
 )
 
+# Generated reports are kept on disk, only their id is kept in the session.
+# The stores are created once per server process (the script runs again on every rerun),
+# so that their lock serializes the writes and evictions of all the sessions
+
+@st.cache_resource
+def get_report_store():
+    return ReportStore()
+
+@st.cache_resource
+def get_session_store():
+    # The previous report of each session (JSON, see delta.py) has its own store, outside of the reports limits
+    return ReportStore(
+        directory="./storage/report_sessions",
+        suffix=".json.gz",
+        max_html_bytes=4 * DEFAULT_MAX_HTML_BYTES,  # the charts and the report html of every company
+    )
+
+@st.cache_resource
+def start_warmup_scheduler():
+    # A single scheduler per server process, refreshing the prices and news caches ahead of market open
+    if os.getenv("WARMUP_ENABLED", "false").lower() != "true":
+        return None
+    scheduler = WarmupScheduler.from_env()
+    scheduler.start()
+    return scheduler
+
+def generate_delta_report(companies, period):
+    # The previous report of the session is kept in the session store, only its id is kept in the session
+    previous = None
+    if "report_session_id" in st.session_state:
+        try:
+            previous = ReportSession.model_validate_json(get_session_store().read(st.session_state["report_session_id"]))
+        except KeyError:
+            # Evicted from the store, the report is generated from scratch
+            pass
+
+    response, session = run_delta(companies, period, previous)
+    if session is not previous:
+        try:
+            st.session_state["report_session_id"] = get_session_store().put(session.model_dump_json())
+        except ReportTooLargeError:
+            # The next request of the session will be generated from scratch
+            st.session_state.pop("report_session_id", None)
+    return response
+
 def generate_report(companies, period):
     # Progress bar
     progress_bar = st.progress(0)
@@ -28,13 +78,20 @@ def generate_report(companies, period):
         status_text.text(f"Analyzing companies: {companies} for the last {period} months...")
     
     try:
-        user_query = f"I want an analysis of the companies {companies} stocks over the last {period} months."
-        result = manager_agent.run(user_query)
+        if delta_enabled():
+            # Follow-up requests only fetch the companies and periods that changed
+            response = generate_delta_report(companies, period)
+        elif fan_out_enabled() and len(split_companies(companies)) > 1:
+            # One concurrent sub-run per company instead of a single manager conversation
+            response = run_fan_out(companies, period)
+        else:
+            user_query = f"I want an analysis of the companies {companies} stocks over the last {period} months."
+            response = manager_agent.run(user_query).content
         
         progress_bar.progress(90)
 
         status_text.text("Finalizing report...")
-        html_content = result.content.complete_page_html_code
+        html_content = response.complete_page_html_code
         
         # Update progress to completion
         progress_bar.progress(100)
@@ -48,8 +105,34 @@ def generate_report(companies, period):
         st.error(f"An error occurred: {str(e)}")
         return f"<p>Error generating report: {str(e)}</p>"
 
+def display_report(report_id):
+    # Read the report back from the store instead of keeping the html in the session state.
+    # Streamlit still holds its own copy while the report is displayed: the download data stays
+    # in the media file manager until the next reruns of the session
+    try:
+        html_content = get_report_store().read(report_id)
+    except KeyError:
+        # Evicted by another session in the meantime
+        st.session_state.pop("report_id", None)
+        st.warning("The report is no longer available, please generate it again.")
+        return
+    components.html(html_content, height=800, scrolling=True)
+
+    # Download button for the HTML report
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"financial_report_{timestamp}.html"
+
+    st.download_button(
+        label="Download HTML Report",
+        data=html_content,
+        file_name=filename,
+        mime="text/html"
+    )
+
 # Main function to run the Streamlit app
 def main():
+    start_warmup_scheduler()
+
     st.title("AI Finance Agent Team 💲")
     
     st.markdown("""
@@ -80,20 +163,22 @@ def main():
         else:
             st.subheader("Financial Analysis Report")
             
-            # Generate and display the report
-            html_content = generate_report(companies, period)            
-            components.html(html_content, height=800, scrolling=True)
-            
-            # Download button for the HTML report
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"financial_report_{timestamp}.html"
-            
-            st.download_button(
-                label="Download HTML Report",
-                data=html_content,
-                file_name=filename,
-                mime="text/html"
-            )
+            # Generate, store and display the report
+            html_content = generate_report(companies, period)
+            try:
+                report_id = get_report_store().put(html_content)
+            except ReportTooLargeError as e:
+                st.error(f"The generated report is too large to be displayed: {str(e)}")
+                return
+            del html_content
+
+            st.session_state["report_id"] = report_id
+            display_report(report_id)
+
+    elif "report_id" in st.session_state and get_report_store().exists(st.session_state["report_id"]):
+        # Keep showing the last report of the session across reruns (e.g. after a download)
+        st.subheader("Financial Analysis Report")
+        display_report(st.session_state["report_id"])
 
 if __name__ == "__main__":
     main() 
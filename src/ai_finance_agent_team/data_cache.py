@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import inspect
+import sqlite3
+import functools
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+
+
+DEFAULT_DATA_CACHE_DB_FILE = "./storage/data_cache.db"
+
+# Cache modes, following the LLM cache modes (see llm_cache.py) so that the tools results are recorded
+# and replayed along with the LLM responses
+#   cache:  cached results younger than the ttl are reused, misses are fetched and stored
+#   record: every call fetches and stores its result
+#   replay: only stored results are used (ttl ignored), a miss raises DataCacheMiss instead of fetching
+
+DATA_CACHE_MODES = ("cache", "record", "replay")
+
+
+class DataCacheMiss(KeyError):
+    "Raised in replay mode when no recorded result matches the tool call"
+
+
+class DataCache:
+    """
+        SQLite-backed TTL cache for the tools results (historical prices, news searches).
+
+        The cache lives on disk so that it is shared between the app and the warm-up scheduler,
+        whether the scheduler runs in the app process or as a separate process.
+    """
+
+    def __init__(self, table_name: str, ttl: int, db_file: str = DEFAULT_DATA_CACHE_DB_FILE, mode: str = "cache"):
+        if mode not in DATA_CACHE_MODES:
+            raise ValueError(f"Invalid cache mode {mode!r}, valid modes: {', '.join(DATA_CACHE_MODES)}")
+        self.db_file = db_file
+        self.table_name = table_name
+        self.ttl = ttl
+        self.mode = mode
+        self._initialized = False
+
+
+    def __deepcopy__(self, memo):
+        # Agents may deep copy their tools, the cache is shared
+        return self
+
+
+    @contextmanager
+    def _connect(self):
+        # One connection per operation, so the cache can be used from any thread.
+        # The database is only created on first use, not when the cache is instantiated
+        if not self._initialized:
+            db_dir = os.path.dirname(self.db_file)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+        conn = sqlite3.connect(self.db_file, timeout=30)
+        try:
+            with conn:
+                if not self._initialized:
+                    conn.execute(
+                        f"CREATE TABLE IF NOT EXISTS {self.table_name} ("
+                        "key TEXT PRIMARY KEY, value TEXT, created_at REAL)"
+                    )
+                    self._initialized = True
+                yield conn
+        finally:
+            conn.close()
+
+
+    @staticmethod
+    def make_key(name: str, **kwargs) -> str:
+        "Key of a tool call, made of the tool name and its arguments"
+        return f"{name}:{json.dumps(kwargs, sort_keys=True, default=str)}"
+
+
+    def get(self, key: str) -> Optional[str]:
+        "Return the cached value for a key, or None if it is missing or expired (or in record mode)"
+        if self.mode == "record":
+            return None
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT value, created_at FROM {self.table_name} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (self.mode == "cache" and time.time() - row[1] > self.ttl):
+            return None
+        return row[0]
+
+
+    def lookup(self, key: str) -> Optional[str]:
+        "Like `get`, but a miss in replay mode raises DataCacheMiss since the value must not be fetched"
+        value = self.get(key)
+        if value is None and self.mode == "replay":
+            raise DataCacheMiss(f"No recorded result for {key}")
+        return value
+
+
+    def set(self, key: str, value: str):
+        "Store the value for a key"
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table_name} (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+
+
+
+def cached_tool(function: Callable[..., str], cache: DataCache, namespace: Optional[Callable[[], str]] = None) -> Callable[..., str]:
+    """
+        Wrap a tool function so that its results go through a DataCache.
+
+        The wrapper keeps the name, signature and docstring of the function, so the agent sees the same tool.
+        `wrapper.refresh(...)` calls the function and stores its result regardless of the cache state,
+        it is used by the warm-up scheduler.
+        `namespace` is called on every call and prefixes the keys, for the results that depend on more than
+        the arguments (e.g. the market data provider in use).
+    """
+    signature = inspect.signature(function)
+
+    def _key(*args, **kwargs) -> str:
+        # Key on the bound arguments, defaults included, so that every way of calling the tool shares the entry
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        name = function.__name__ if namespace is None else f"{namespace()}:{function.__name__}"
+        return DataCache.make_key(name, **bound.arguments)
+
+    def refresh(*args, **kwargs) -> str:
+        result = function(*args, **kwargs)
+        cache.set(_key(*args, **kwargs), result)
+        return result
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs) -> str:
+        cached = cache.lookup(_key(*args, **kwargs))
+        if cached is not None:
+            return cached
+        return refresh(*args, **kwargs)
+
+    wrapper.refresh = refresh
+    return wrapper
@@ -0,0 +1,114 @@
+import os
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from tools import ManagerResponse
+from fan_out import CompanyAnalysis, split_companies, analyze_companies, compose_report
+from agent_team import news_cache, price_cache
+
+
+logger = logging.getLogger(__name__)
+
+
+# Delta requests: a follow-up request of a session (another period, one more company...) reuses the parts
+# of the previous report that do not change instead of generating the whole report again.
+# The news and prices of the previous report are only reused as long as the news and prices caches would keep them
+# (NEWS_CACHE_TTL and PRICE_CACHE_TTL)
+
+
+class ReportSession(BaseModel):
+    "Schema for the last report of a session, used to compute the delta of the next request"
+    period: int = Field(description="The analysis period in months")
+    analyses: List[CompanyAnalysis] = Field(description="The results of the sub-run of each company")
+    report_html: str = Field(description="The html code of the report")
+    created_at: float = Field(
+        default_factory=time.time,
+        description="The timestamp of the oldest news and prices of the report, used to expire them",
+    )
+
+
+def delta_enabled() -> bool:
+    return os.getenv("DELTA_REPORTS_ENABLED", "false").lower() == "true"
+
+
+def _freshness(previous: ReportSession, now: Optional[float] = None) -> Tuple[bool, bool]:
+    "Whether the news and the prices of the previous report are still fresh enough to be reused"
+    age = (now or time.time()) - previous.created_at
+    return age <= news_cache.ttl, age <= price_cache.ttl
+
+
+def plan_delta(
+    previous: Optional[ReportSession], names: List[str], period: int, now: Optional[float] = None
+) -> Dict[str, CompanyAnalysis]:
+    """
+        Find the parts of the previous report that can be reused for each company of the new request.
+
+        The news of a company do not depend on the period, they are reused as long as the company was already
+        in the previous request. The prices and the chart are only reused if the period did not change.
+        Nothing older than the news and prices caches TTLs is reused. New companies get a complete sub-run.
+        The html section of the company comes along, it is only kept by the report if its inputs did not change.
+
+        Returns:
+            Dict[str, CompanyAnalysis]: The reusable parts, by company name.
+    """
+    if previous is None:
+        return {}
+    news_fresh, prices_fresh = _freshness(previous, now)
+
+    reuse = {}
+    previous_analyses = {analysis.company_name: analysis for analysis in previous.analyses}
+    for name in names:
+        analysis = previous_analyses.get(name)
+        if analysis is None:
+            continue
+        news = analysis.news if news_fresh else None
+        if period == previous.period and prices_fresh:
+            reuse[name] = CompanyAnalysis(
+                company_name=name, news=news, financial_data=analysis.financial_data, chart=analysis.chart,
+                section_html=analysis.section_html, section_key=analysis.section_key,
+            )
+        elif news is not None:
+            reuse[name] = CompanyAnalysis(
+                company_name=name, news=news, section_html=analysis.section_html, section_key=analysis.section_key
+            )
+    return reuse
+
+
+def run_delta(companies: str, period: int, previous: Optional[ReportSession] = None) -> Tuple[ManagerResponse, ReportSession]:
+    """
+        Generate the report of the companies, reusing what can be reused from the previous report of the session.
+
+        Args:
+            companies (str): The comma separated names of the companies.
+            period (int): The analysis period in months.
+            previous (ReportSession): The previous report of the session, if any.
+
+        Returns:
+            Tuple[ManagerResponse, ReportSession]: The complete report page, and the session to use for the next request.
+    """
+    names = split_companies(companies)
+    now = time.time()
+
+    if (
+        previous is not None
+        and period == previous.period
+        and names == [a.company_name for a in previous.analyses]
+        and all(_freshness(previous, now))
+    ):
+        # Same request as the previous one, the report does not change
+        return ManagerResponse(complete_page_html_code=previous.report_html), previous
+
+    reuse = plan_delta(previous, names, period, now)
+    logger.info(f"Delta request: reusing {len(reuse)}/{len(names)} companies of the previous report")
+
+    analyses = analyze_companies(names, period, reuse)
+    response = compose_report(analyses, period)
+    # The reused parts keep their age, so that a chain of follow-up requests cannot extend their lifetime
+    created_at = previous.created_at if reuse else now
+    session = ReportSession(
+        period=period, analyses=analyses, report_html=response.complete_page_html_code, created_at=created_at
+    )
+    return response, session
@@ -0,0 +1,345 @@
+import os
+import re
+import html
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from tools import NewsList, FinancialDataList, ChartDataResponse, ManagerResponse
+from price_frame import to_frame, to_chart_data, rebase, comparison_summary
+from agent_team import create_web_agent, create_finance_agent, create_dataviz_agent, create_frontend_agent
+
+
+logger = logging.getLogger(__name__)
+
+
+# Fan-out mode: each company gets its own concurrent news, prices and chart sub-run with a small context,
+# then the Frontend Agent writes one section per company and a short conclusion, stitched into the report page
+
+DEFAULT_FAN_OUT_MAX_WORKERS = 8
+
+# Placeholder name of the chart comparing the companies
+COMPARISON_CHART = "__comparison__"
+
+REPORT_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: Arial, Helvetica, sans-serif; max-width: 1000px; margin: 0 auto; padding: 24px; color: #222; }}
+section {{ margin-bottom: 40px; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+{sections}
+</body>
+</html>
+"""
+
+
+class CompanyAnalysis(BaseModel):
+    "Schema for the results of the sub-run of a company"
+    company_name: str = Field(description="The name of the company")
+    news: Optional[NewsList] = Field(default=None, description="The latest news for the company")
+    financial_data: Optional[FinancialDataList] = Field(default=None, description="The historical prices of the company")
+    chart: Optional[ChartDataResponse] = Field(default=None, description="The chart of the historical prices")
+    section_html: Optional[str] = Field(default=None, description="The html section of the company in the report")
+    section_key: Optional[str] = Field(default=None, description="The key of the inputs the section was written from")
+
+
+def fan_out_enabled() -> bool:
+    return os.getenv("FAN_OUT_ENABLED", "false").lower() == "true"
+
+
+def fan_out_max_workers() -> int:
+    return int(os.getenv("FAN_OUT_MAX_WORKERS", DEFAULT_FAN_OUT_MAX_WORKERS))
+
+
+def split_companies(companies: str) -> List[str]:
+    "Split the comma separated companies of the form, removing the empty names and the duplicates"
+    names = [name.strip() for name in companies.split(",")]
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def chart_placeholder(company: str) -> str:
+    return f"{{{{chart:{company}}}}}"
+
+
+def get_news(company: str) -> Optional[NewsList]:
+    try:
+        content = create_web_agent().run(f"Search the latest news about the company {company}").content
+        # The content is not the response model when the structured output could not be parsed
+        news = [item for company_news in content.company_news for item in company_news.news]
+    except Exception as e:
+        logger.warning(f"News sub-run for {company} failed: {e}")
+        return None
+    return NewsList(company_name=company, news=news)
+
+
+def get_financial_data(company: str, period: int) -> Optional[FinancialDataList]:
+    try:
+        content = create_finance_agent().run(
+            f"Get the historical prices of the company {company} over the last {period} months"
+        ).content
+        companies_financial_data = content.companies_financial_data
+    except Exception as e:
+        logger.warning(f"Financial data sub-run for {company} failed: {e}")
+        return None
+    if not companies_financial_data:
+        return None
+    return companies_financial_data[0]
+
+
+def create_chart(company: str, period: int, financial_data: FinancialDataList) -> Optional[ChartDataResponse]:
+    # The agent gets the closing prices as arrays rather than one object per day
+    frame = to_frame([financial_data])
+    data = to_chart_data(frame) if not frame.empty else financial_data.model_dump_json()
+    try:
+        return create_dataviz_agent().run(
+            f"Create a chart of the stock prices of the company {company} over the last {period} months "
+            f"from the following closing prices: {data}"
+        ).content
+    except Exception as e:
+        logger.warning(f"Chart sub-run for {company} failed: {e}")
+        return None
+
+
+def create_comparison_chart(analyses: List[CompanyAnalysis], period: int) -> Optional[ChartDataResponse]:
+    "Chart comparing the performance of the companies, their closing prices rebased to 100 on the first date"
+    frame = to_frame([analysis.financial_data for analysis in analyses if analysis.financial_data])
+    if len(frame.columns) < 2 or frame.empty:
+        return None
+    try:
+        return create_dataviz_agent().run(
+            f"Create a chart comparing the stock performance of the companies {', '.join(frame.columns)} "
+            f"over the last {period} months, from the following closing prices rebased to 100 on the first date: "
+            f"{to_chart_data(rebase(frame))}"
+        ).content
+    except Exception as e:
+        logger.warning(f"Comparison chart failed: {e}")
+        return None
+
+
+def analyze_company(company: str, period: int, reuse: Optional[CompanyAnalysis] = None) -> CompanyAnalysis:
+    """
+        Sub-run of a company: the news search runs concurrently with the prices fetch followed by the chart creation.
+        The parts already available in `reuse` (e.g. from the previous report of the session) are not fetched again.
+    """
+    news = reuse.news if reuse else None
+    financial_data = reuse.financial_data if reuse else None
+    chart = reuse.chart if reuse else None
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        news_future = executor.submit(get_news, company) if news is None else None
+        if financial_data is None:
+            financial_data = get_financial_data(company, period)
+            chart = None
+        if chart is None and financial_data:
+            chart = create_chart(company, period, financial_data)
+        if news_future is not None:
+            news = news_future.result()
+
+    return CompanyAnalysis(
+        company_name=company, news=news, financial_data=financial_data, chart=chart,
+        section_html=reuse.section_html if reuse else None, section_key=reuse.section_key if reuse else None,
+    )
+
+
+def summarize_financial_data(financial_data: FinancialDataList) -> str:
+    # The Frontend Agent gets a summary of the prices, the full series is already in the chart
+    if not financial_data.financial_data:
+        return "no data"
+    frame = to_frame([financial_data])
+    if frame.empty:
+        # None of the dates could be parsed, keep them as written by the agent
+        first, last = financial_data.financial_data[0], financial_data.financial_data[-1]
+        return f"from {first.date} to {last.date}: first close {first.metrics.Close:.2f}, last close {last.metrics.Close:.2f}"
+    summary = comparison_summary(frame).iloc[0]
+    return (
+        f"from {summary.first_date:%Y-%m-%d} to {summary.last_date:%Y-%m-%d}: "
+        f"first close {summary.first_close:.2f}, last close {summary.last_close:.2f}, change {summary.change_pct:+.2f}%, "
+        f"min {summary.min_close:.2f}, max {summary.max_close:.2f}"
+    )
+
+
+def insert_charts(html_code: str, analyses: List[CompanyAnalysis], comparison_chart: Optional[ChartDataResponse] = None) -> str:
+    """
+        Replace the charts placeholders of the page with the charts html code.
+
+        Each chart is isolated in its own iframe, so that the charts of different companies cannot clash
+        (the generated charts tend to reuse the same element ids and global variables).
+        The charts whose placeholder is missing are appended at the end of the page.
+    """
+    charts = {analysis.company_name: analysis.chart for analysis in analyses}
+    charts[COMPARISON_CHART] = comparison_chart
+
+    missing_charts = []
+    for name, chart in charts.items():
+        placeholder = chart_placeholder(name)
+        if chart is None:
+            html_code = html_code.replace(placeholder, "")
+            continue
+        chart_html = (
+            f'<iframe srcdoc="{html.escape(chart.html_code, quote=True)}" '
+            f'style="width: 100%; height: 500px; border: none;"></iframe>'
+        )
+        if placeholder in html_code:
+            html_code = html_code.replace(placeholder, chart_html)
+        else:
+            missing_charts.append(chart_html)
+
+    if missing_charts:
+        charts_html = "\n".join(missing_charts)
+        if "</body>" in html_code:
+            html_code = html_code.replace("</body>", f"{charts_html}\n</body>", 1)
+        else:
+            html_code += charts_html
+    return html_code
+
+
+def section_inputs(analysis: CompanyAnalysis, period: int) -> str:
+    "The data the Frontend Agent gets to write the section of a company"
+    news = analysis.news.model_dump_json() if analysis.news else "no news found"
+    prices = summarize_financial_data(analysis.financial_data) if analysis.financial_data else "no data"
+    chart = chart_placeholder(analysis.company_name) if analysis.chart else "no chart"
+    return (
+        f"Company: {analysis.company_name}\n"
+        f"News: {news}\n"
+        f"Stock prices over the last {period} months: {prices}\n"
+        f"Chart placeholder: {chart}"
+    )
+
+
+def section_key(analysis: CompanyAnalysis, period: int) -> str:
+    "Key of the section of a company, it only changes when the inputs of the section change"
+    return hashlib.sha256(section_inputs(analysis, period).encode()).hexdigest()
+
+
+def _fragment(html_code: str) -> str:
+    # Keep the content of the body when the agent wrote a complete page instead of a fragment
+    match = re.search(r"<body[^>]*>(.*)</body>", html_code, re.DOTALL | re.IGNORECASE)
+    return (match.group(1) if match else html_code).strip()
+
+
+def create_section(analysis: CompanyAnalysis, period: int) -> Optional[str]:
+    try:
+        html_code = create_frontend_agent().run(
+            "Create the html section of a report about the stock of a company, as an html fragment "
+            "(a single <section> element with inline css, without <html>, <head> or <body>). "
+            "Present the news with their analysis and the stock prices evolution, "
+            "and write the chart placeholder exactly as given where the chart of the company must be displayed, "
+            "it will be replaced by the chart afterwards.\n\n"
+            + section_inputs(analysis, period)
+        ).content.html_code
+    except Exception as e:
+        logger.warning(f"Report section for {analysis.company_name} failed: {e}")
+        return None
+    return _fragment(html_code)
+
+
+def create_conclusion(analyses: List[CompanyAnalysis], period: int) -> str:
+    "Short conclusion of the report, the only part of the page written from the data of all the companies"
+    lines = []
+    for analysis in analyses:
+        prices = summarize_financial_data(analysis.financial_data) if analysis.financial_data else "no data"
+        titles = "; ".join(item.title for item in analysis.news.news) if analysis.news else "no news found"
+        lines.append(f"{analysis.company_name}: stock prices over the last {period} months {prices}. News: {titles}")
+    try:
+        html_code = create_frontend_agent().run(
+            "Write a short conclusion of a report about the following companies stocks, in a few sentences, "
+            "as an html fragment (a single <section> element with a title, without <html>, <head> or <body>).\n\n"
+            + "\n".join(lines)
+        ).content.html_code
+    except Exception as e:
+        logger.warning(f"Report conclusion failed: {e}")
+        return ""
+    return _fragment(html_code)
+
+
+def _fallback_section(analysis: CompanyAnalysis) -> str:
+    # Keeps the chart of the company in the report when its section could not be written
+    return (
+        f"<section>\n<h2>{html.escape(analysis.company_name)}</h2>\n"
+        f"<p>The analysis of the company could not be generated.</p>\n"
+        f"{chart_placeholder(analysis.company_name)}\n</section>"
+    )
+
+
+def compose_report(analyses: List[CompanyAnalysis], period: int) -> ManagerResponse:
+    """
+        Build the report page from the results of the sub-runs.
+
+        The section of each company is written by the Frontend Agent and stored in its analysis with the key
+        of its inputs (the analyses are updated in place), so a section is only written again when the news,
+        prices or chart of its company changed. The conclusion and the comparison chart are created concurrently
+        with the sections, then the page is stitched from the template.
+    """
+    compared = sum(1 for analysis in analyses if analysis.financial_data) > 1
+    keys = [section_key(analysis, period) for analysis in analyses]
+    stale = [
+        (analysis, key) for analysis, key in zip(analyses, keys)
+        if analysis.section_html is None or analysis.section_key != key
+    ]
+    logger.info(f"Report sections: writing {len(stale)}/{len(analyses)}")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(fan_out_max_workers(), len(stale) + 2))) as executor:
+        comparison_future = executor.submit(create_comparison_chart, analyses, period) if compared else None
+        conclusion_future = executor.submit(create_conclusion, analyses, period)
+        section_futures = [(analysis, key, executor.submit(create_section, analysis, period)) for analysis, key in stale]
+        for analysis, key, future in section_futures:
+            section = future.result()
+            # A failed section is not stored, it is written again by the next report
+            analysis.section_html = section
+            analysis.section_key = key if section is not None else None
+        conclusion = conclusion_future.result()
+        comparison_chart = comparison_future.result() if comparison_future else None
+
+    sections = [analysis.section_html or _fallback_section(analysis) for analysis in analyses]
+    if compared:
+        sections.append(
+            "<section>\n<h2>Stock performance comparison</h2>\n"
+            "<p>Closing prices rebased to 100 on the first date of the period.</p>\n"
+            f"{chart_placeholder(COMPARISON_CHART)}\n</section>"
+        )
+    if conclusion:
+        sections.append(conclusion)
+
+    title = html.escape(f"Stocks report: {', '.join(analysis.company_name for analysis in analyses)}")
+    page = REPORT_TEMPLATE.format(title=title, sections="\n".join(sections))
+    return ManagerResponse(complete_page_html_code=insert_charts(page, analyses, comparison_chart))
+
+
+def analyze_companies(
+    names: List[str],
+    period: int,
+    reuse: Optional[Dict[str, CompanyAnalysis]] = None,
+    max_workers: Optional[int] = None,
+) -> List[CompanyAnalysis]:
+    "Run the sub-runs of the companies concurrently, at most `max_workers` at the same time"
+    reuse = reuse or {}
+    if max_workers is None:
+        max_workers = fan_out_max_workers()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(names)))) as executor:
+        return list(executor.map(lambda name: analyze_company(name, period, reuse.get(name)), names))
+
+
+def run_fan_out(companies: str, period: int, max_workers: Optional[int] = None) -> ManagerResponse:
+    """
+        Generate the report of the companies with one concurrent sub-run per company.
+
+        Args:
+            companies (str): The comma separated names of the companies.
+            period (int): The analysis period in months.
+            max_workers (int): The maximum number of companies analyzed at the same time.
+
+        Returns:
+            ManagerResponse: The complete report page, as produced by the manager agent.
+    """
+    analyses = analyze_companies(split_companies(companies), period, max_workers=max_workers)
+    return compose_report(analyses, period)
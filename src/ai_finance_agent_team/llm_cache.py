@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+from openai.types.chat import ChatCompletion, ParsedChatCompletion
+
+from agno.models.message import Message
+from agno.models.openai import OpenAIChat
+
+
+
+# Cache modes
+#   off:    the cache is bypassed, every call goes to the model provider
+#   cache:  cached responses younger than the ttl are reused, misses are recorded
+#   record: every call goes to the model provider and its response is recorded
+#   replay: only recorded responses are used (ttl ignored), a miss raises LLMCacheMiss
+
+CACHE_MODES = ("off", "cache", "record", "replay")
+
+DEFAULT_CACHE_DB_FILE = "./storage/llm_cache.db"
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+
+
+class LLMCacheMiss(KeyError):
+    "Raised in replay mode when no recorded response matches the request"
+
+
+class LLMCache:
+    """
+        SQLite-backed cache of the LLM responses, keyed by a hash of the request.
+
+        The key covers the model id, the messages (which include the agent instructions as system message)
+        and every request parameter (tools, response schema, temperature, seed...), so any change in the agent
+        inputs results in a new generation.
+    """
+
+    def __init__(
+        self,
+        db_file: str = DEFAULT_CACHE_DB_FILE,
+        table_name: str = "llm_cache",
+        ttl: int = DEFAULT_CACHE_TTL,
+        mode: str = "cache",
+    ):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Invalid cache mode {mode!r}, valid modes: {', '.join(CACHE_MODES)}")
+        self.db_file = db_file
+        self.table_name = table_name
+        self.ttl = ttl
+        self.mode = mode
+        self._initialized = False
+
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "LLMCache":
+        "Create a cache configured by the LLM_CACHE_MODE, LLM_CACHE_TTL and LLM_CACHE_DB_FILE environment variables"
+        kwargs.setdefault("mode", os.getenv("LLM_CACHE_MODE", "cache"))
+        kwargs.setdefault("ttl", int(os.getenv("LLM_CACHE_TTL", DEFAULT_CACHE_TTL)))
+        kwargs.setdefault("db_file", os.getenv("LLM_CACHE_DB_FILE", DEFAULT_CACHE_DB_FILE))
+        return cls(**kwargs)
+
+
+    def __deepcopy__(self, memo):
+        # Agents may deep copy their model, the cache is shared
+        return self
+
+
+    @contextmanager
+    def _connect(self):
+        # One connection per operation, so the cache can be used from any thread.
+        # The database is only created on first use, not when the cache is instantiated
+        if not self._initialized:
+            db_dir = os.path.dirname(self.db_file)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+        conn = sqlite3.connect(self.db_file, timeout=30)
+        try:
+            with conn:
+                if not self._initialized:
+                    conn.execute(
+                        f"CREATE TABLE IF NOT EXISTS {self.table_name} ("
+                        "key TEXT PRIMARY KEY, model_id TEXT, response TEXT, created_at REAL)"
+                    )
+                    self._initialized = True
+                yield conn
+        finally:
+            conn.close()
+
+
+    @staticmethod
+    def make_key(model_id: str, messages: List[Dict[str, Any]], request_kwargs: Optional[Dict[str, Any]] = None) -> str:
+        """
+            Compute the cache key of a request.
+
+            Args:
+                model_id (str): The id of the model.
+                messages (List[Dict]): The formatted messages sent to the model.
+                request_kwargs (Dict): The other parameters of the request (tools, response_format, temperature...).
+
+            Returns:
+                str: The sha256 hex digest of the request.
+        """
+        request_kwargs = dict(request_kwargs or {})
+        response_format = request_kwargs.get("response_format")
+        if isinstance(response_format, type) and issubclass(response_format, BaseModel):
+            # Key on the schema of the structured output rather than on the class name
+            request_kwargs["response_format"] = response_format.model_json_schema()
+        payload = {
+            "model_id": model_id,
+            "messages": messages,
+            "request_kwargs": request_kwargs,
+        }
+        data = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+    def get(self, key: str, mode: Optional[str] = None) -> Optional[str]:
+        "Return the cached response for a key, or None if there is no usable entry (`mode` overrides the cache mode)"
+        mode = mode or self.mode
+        if mode in ("off", "record"):
+            return None
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT response, created_at FROM {self.table_name} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        response, created_at = row
+        if mode == "cache" and time.time() - created_at > self.ttl:
+            return None
+        return response
+
+
+    def set(self, key: str, model_id: str, response: str, mode: Optional[str] = None):
+        "Store the response for a key (`mode` overrides the cache mode)"
+        mode = mode or self.mode
+        if mode in ("off", "replay"):
+            return
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table_name} (key, model_id, response, created_at) VALUES (?, ?, ?, ?)",
+                (key, model_id, response, time.time()),
+            )
+
+
+    def clear_expired(self) -> int:
+        "Delete the entries older than the ttl and return how many were deleted"
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"DELETE FROM {self.table_name} WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+            return cursor.rowcount
+
+
+
+@dataclass
+class CachedOpenAIChat(OpenAIChat):
+    """
+        OpenAIChat model whose completions go through an LLMCache.
+
+        A cache hit skips the generation entirely, the recorded completion is handed back to agno as if it
+        came from the OpenAI API (tool calls included). The tools themselves are still executed: to replay
+        an agent that calls tools offline, its tools results must be recorded and replayed as well
+        (see `data_cache.DataCache`, whose mode follows the LLM cache in agent_team.py).
+
+        `cache_mode` is the mode of this model while the cache is in cache mode, e.g. off for the agents whose
+        answers depend on live data. The off, record and replay modes of the cache apply to every model,
+        so that a recorded session can be replayed entirely offline.
+    """
+
+    cache: Optional[LLMCache] = None
+    cache_mode: Optional[str] = None
+
+
+    def _effective_cache_mode(self) -> str:
+        if self.cache is None:
+            return "off"
+        if self.cache.mode != "cache":
+            return self.cache.mode
+        return self.cache_mode or self.cache.mode
+
+
+    def _cache_key(self, messages: List[Message]) -> str:
+        return LLMCache.make_key(
+            model_id=self.id,
+            messages=[self._format_message(m) for m in messages],
+            request_kwargs=self.request_kwargs,
+        )
+
+
+    def _load_response(self, data: str):
+        # Structured outputs come back as ParsedChatCompletion, rebuild the parsed pydantic model as well
+        if isinstance(self.response_format, type) and issubclass(self.response_format, BaseModel):
+            return ParsedChatCompletion[self.response_format].model_validate_json(data)
+        return ChatCompletion.model_validate_json(data)
+
+
+    def invoke(self, messages: List[Message]):
+        mode = self._effective_cache_mode()
+        if mode == "off":
+            return super().invoke(messages)
+
+        key = self._cache_key(messages)
+        cached = self.cache.get(key, mode)
+        if cached is not None:
+            return self._load_response(cached)
+        if mode == "replay":
+            raise LLMCacheMiss(f"No recorded response for {self.id} request {key}")
+
+        response = super().invoke(messages)
+        self.cache.set(key, self.id, response.model_dump_json(), mode)
+        return response
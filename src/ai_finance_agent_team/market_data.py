@@ -0,0 +1,226 @@
+import os
+import zlib
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+
+
+# Market data providers: where the historical prices of `get_historical_prices` come from.
+# The provider is selected with the MARKET_DATA_PROVIDER environment variable:
+#   yfinance:  Yahoo Finance (default)
+#   local:     a directory of <SYMBOL>.parquet or <SYMBOL>.csv files of daily prices (MARKET_DATA_DIR)
+#   synthetic: random walks generated in memory, for load tests and benchmarks without network access
+
+PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+}
+
+# Bars of the intervals, labelled by their first day as yfinance does
+INTERVAL_RULES = {
+    "1d": None,
+    "1wk": "W-MON",
+    "1mo": "MS",
+}
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+MARKET_TIMEZONE = "America/New_York"
+
+
+def to_market_time(dates: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    "Dates in the market timezone, naive dates being market dates (not UTC)"
+    if dates.tz is None:
+        return dates.tz_localize(MARKET_TIMEZONE)
+    return dates.tz_convert(MARKET_TIMEZONE)
+
+
+class MarketDataProvider(ABC):
+    "Interface of the market data providers"
+
+    # Name of the provider, part of the prices cache keys so that providers never share cached prices
+    name: str = "market_data"
+
+    @abstractmethod
+    def history(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        """
+            Get the historical prices of a symbol.
+
+            Args:
+                symbol (str): The stock symbol.
+                period (str): The period, one of 1mo, 3mo, 6mo, 1y, 2y.
+                interval (str): The bars interval, one of 1d, 1wk, 1mo.
+
+            Returns:
+                pd.DataFrame: The Open, High, Low, Close and Volume columns, indexed by date (as yfinance history).
+        """
+
+
+def resample(prices: pd.DataFrame, interval: str) -> pd.DataFrame:
+    "Aggregate daily bars to the given interval"
+    rule = INTERVAL_RULES[interval]
+    if rule is None:
+        return prices
+    bars = prices.resample(rule, label="left", closed="left").agg({
+        "Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum",
+    })
+    return bars.dropna(subset=["Close"])
+
+
+class YFinanceProvider(MarketDataProvider):
+    "Historical prices from Yahoo Finance"
+
+    name = "yfinance"
+
+    def history(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        stock = yf.Ticker(symbol)
+        return stock.history(period=period, interval=interval)
+
+
+class LocalFileProvider(MarketDataProvider):
+    """
+        Historical prices from a directory of daily prices files, one <SYMBOL>.parquet or <SYMBOL>.csv per symbol,
+        with a Date column and the Open, High, Low, Close and Volume columns.
+
+        The period is counted back from the last date of the file, so a dataset recorded once stays usable.
+        Parquet files are memory-mapped and only the rows of the period are read.
+    """
+
+    name = "local"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+
+    def _path(self, symbol: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{symbol.upper()}.{extension}")
+
+
+    def _read_parquet(self, path: str, period: str) -> pd.DataFrame:
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        # Read the dates first to find the end of the period, then only the rows of the period
+        dates = pq.read_table(path, columns=["Date"], memory_map=True).column("Date")
+        end = pd.Timestamp(pc.max(dates).as_py())
+        start = end - PERIOD_OFFSETS[period]
+        table = pq.read_table(
+            path,
+            columns=["Date"] + PRICE_COLUMNS,
+            memory_map=True,
+            filters=[("Date", ">=", start.to_pydatetime())],
+        )
+        prices = table.to_pandas().set_index("Date")
+        prices.index = to_market_time(pd.DatetimeIndex(prices.index))
+        return prices
+
+
+    def _read_csv(self, path: str, period: str) -> pd.DataFrame:
+        prices = pd.read_csv(path, index_col="Date", usecols=["Date"] + PRICE_COLUMNS)
+        # Dates with an UTC offset may mix offsets (daylight saving time), parse them through UTC
+        aware = pd.Timestamp(prices.index[0]).tz is not None if len(prices) else False
+        prices.index = to_market_time(pd.to_datetime(prices.index, utc=aware))
+        start = prices.index.max() - PERIOD_OFFSETS[period]
+        return prices[prices.index >= start]
+
+
+    def history(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        if os.path.exists(self._path(symbol, "parquet")):
+            prices = self._read_parquet(self._path(symbol, "parquet"), period)
+        elif os.path.exists(self._path(symbol, "csv")):
+            prices = self._read_csv(self._path(symbol, "csv"), period)
+        else:
+            raise FileNotFoundError(f"No market data file for {symbol} in {self.directory}")
+        return resample(prices.sort_index(), interval)
+
+
+    @staticmethod
+    def write_parquet(prices: pd.DataFrame, path: str):
+        "Write daily prices (as returned by `history`) to a parquet file readable by this provider"
+        prices = prices[PRICE_COLUMNS].copy()
+        prices.index.name = "Date"
+        prices.reset_index().to_parquet(path, index=False)
+
+
+class SyntheticProvider(MarketDataProvider):
+    """
+        Historical prices generated in memory as a geometric random walk.
+
+        Each symbol gets its own deterministic series (the random generator is seeded from the symbol),
+        so repeated requests return the same prices. The series are kept in memory once generated.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, end: Optional[str] = None, volatility: float = 0.02, seed: int = 0):
+        self.end = end
+        self.volatility = volatility
+        self.seed = seed
+        self._series = {}
+
+
+    def daily_prices(self, symbol: str, period: str) -> pd.DataFrame:
+        end = pd.Timestamp(self.end) if self.end else pd.Timestamp.now().normalize()
+        key = (symbol.upper(), end)
+        if key not in self._series:
+            self._series[key] = self._generate(symbol, end)
+        prices = self._series[key]
+        return prices[prices.index >= prices.index[-1] - PERIOD_OFFSETS[period]]
+
+
+    def _generate(self, symbol: str, end: pd.Timestamp) -> pd.DataFrame:
+        # Always generate the longest period, so that the periods of a symbol are consistent
+        dates = pd.bdate_range(end - PERIOD_OFFSETS["2y"], end, tz=MARKET_TIMEZONE, name="Date")
+        rng = np.random.default_rng([self.seed, zlib.crc32(symbol.upper().encode("utf-8"))])
+
+        size = len(dates)
+        start_price = rng.uniform(20, 500)
+        closes = start_price * np.exp(np.cumsum(rng.normal(0, self.volatility, size)))
+        opens = np.concatenate(([start_price], closes[:-1]))
+        spread = np.abs(rng.normal(0, self.volatility / 2, size))
+        return pd.DataFrame({
+            "Open": opens,
+            "High": np.maximum(opens, closes) * (1 + spread),
+            "Low": np.minimum(opens, closes) * (1 - spread),
+            "Close": closes,
+            "Volume": rng.integers(1_000_000, 50_000_000, size),
+        }, index=dates)
+
+
+    def history(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        return resample(self.daily_prices(symbol, period), interval)
+
+
+def create_market_data_provider(name: Optional[str] = None) -> MarketDataProvider:
+    "Create the market data provider configured by the MARKET_DATA_PROVIDER (and MARKET_DATA_DIR) environment variables"
+    name = name or os.getenv("MARKET_DATA_PROVIDER", "yfinance")
+    if name == "yfinance":
+        return YFinanceProvider()
+    if name == "local":
+        return LocalFileProvider(os.getenv("MARKET_DATA_DIR", "./storage/market_data"))
+    if name == "synthetic":
+        return SyntheticProvider(end=os.getenv("MARKET_DATA_SYNTHETIC_END"))
+    raise ValueError(f"Unknown market data provider: {name}")
+
+
+_provider: Optional[MarketDataProvider] = None
+
+
+def get_market_data_provider() -> MarketDataProvider:
+    global _provider
+    if _provider is None:
+        _provider = create_market_data_provider()
+    return _provider
+
+
+def set_market_data_provider(provider: Optional[MarketDataProvider]):
+    "Replace the market data provider (None goes back to the configured one)"
+    global _provider
+    _provider = provider
@@ -0,0 +1,194 @@
+import json
+import warnings
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from tools import FinancialDataList, FinancialDataResponse
+
+
+
+# Array-backed representation of the financial data: one frame of closing prices, with one column per company
+# and a shared date index, instead of a list of pydantic objects per day per company.
+
+FILL_POLICIES = ("ffill", "none", "drop")
+DATE_FORMAT = "%Y-%m-%d"
+
+FinancialData = Union[FinancialDataResponse, Iterable[FinancialDataList]]
+
+
+def align(frame: pd.DataFrame, fill: str = "ffill", limit: Optional[int] = None) -> pd.DataFrame:
+    """
+        Apply a fill policy to the dates missing for some companies (different exchanges holidays, listing dates...).
+
+        Args:
+            frame (pd.DataFrame): Closing prices, one column per company.
+            fill (str): "ffill" carries the last closing price forward, "none" keeps the missing values as NaN,
+                        "drop" only keeps the dates where every company has a closing price.
+            limit (int): The maximum number of consecutive dates to forward fill.
+
+        Returns:
+            pd.DataFrame: The aligned closing prices.
+    """
+    if fill not in FILL_POLICIES:
+        raise ValueError(f"Invalid fill policy {fill!r}, valid policies: {', '.join(FILL_POLICIES)}")
+    if fill == "ffill":
+        return frame.ffill(limit=limit)
+    if fill == "drop":
+        return frame.dropna(how="any")
+    return frame
+
+
+def _to_frame(series: Dict[str, pd.Series], fill: str) -> pd.DataFrame:
+    # The union of the dates of every company becomes the shared index
+    frame = pd.DataFrame(series, dtype=float).sort_index()
+    frame.index.name = "date"
+    return align(frame, fill)
+
+
+def _parse_date(date) -> pd.Timestamp:
+    # Free-form date written by an agent (e.g. "Jan 4, 2023"), NaT if it cannot be parsed
+    timestamp = pd.to_datetime(date, errors="coerce")
+    if timestamp is not pd.NaT and timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_localize(None)
+    return timestamp
+
+
+def _parse_dates(dates) -> pd.DatetimeIndex:
+    if isinstance(dates, pd.DatetimeIndex):
+        index = dates
+    else:
+        try:
+            with warnings.catch_warnings():
+                # Mixed UTC offsets (e.g. across a DST change) give an object index, handled below
+                warnings.simplefilter("ignore", FutureWarning)
+                index = pd.to_datetime(pd.Index(dates), format="ISO8601")
+        except (ValueError, TypeError):
+            index = None
+        if not isinstance(index, pd.DatetimeIndex):
+            index = pd.DatetimeIndex([_parse_date(date) for date in dates])
+
+    if index.tz is not None:
+        # Keep the local date of the exchange: converting to UTC would move the bars of the exchanges
+        # east of UTC to the previous day
+        index = index.tz_localize(None)
+    return index.normalize()
+
+
+def _company_series(dates, closes) -> pd.Series:
+    series = pd.Series(np.asarray(closes, dtype=float), index=_parse_dates(dates))
+    series = series[series.index.notna()]
+    return series[~series.index.duplicated(keep="last")]
+
+
+def to_frame(financial_data: FinancialData, fill: str = "ffill") -> pd.DataFrame:
+    """
+        Convert the pydantic financial data of the finance agent to an aligned frame of closing prices.
+
+        Args:
+            financial_data: A FinancialDataResponse, or a list of FinancialDataList.
+            fill (str): The fill policy for the missing dates (see `align`).
+
+        Returns:
+            pd.DataFrame: Closing prices indexed by date, one column per company.
+    """
+    if hasattr(financial_data, "companies_financial_data"):
+        financial_data = financial_data.companies_financial_data
+
+    series = {}
+    for company in financial_data:
+        dates = [day.date for day in company.financial_data]
+        closes = [day.metrics.Close for day in company.financial_data]
+        series[company.company_name] = _company_series(dates, closes)
+    return _to_frame(series, fill)
+
+
+def frame_from_json(data: Union[str, bytes], fill: str = "ffill") -> pd.DataFrame:
+    """
+        Build the frame directly from the JSON of a FinancialDataResponse, without creating the pydantic objects.
+    """
+    payload = json.loads(data)
+    series = {}
+    for company in payload["companies_financial_data"]:
+        days = company["financial_data"]
+        series[company["company_name"]] = _company_series(
+            [day["date"] for day in days], [day["metrics"]["Close"] for day in days]
+        )
+    return _to_frame(series, fill)
+
+
+def frame_from_histories(histories: Dict[str, pd.DataFrame], fill: str = "ffill") -> pd.DataFrame:
+    """
+        Build the frame from yfinance history frames (as returned by `yf.Ticker(symbol).history()`), keyed by company.
+    """
+    series = {}
+    for company, history in histories.items():
+        series[company] = _company_series(history.index, history["Close"].to_numpy())
+    return _to_frame(series, fill)
+
+
+def to_financial_data(frame: pd.DataFrame) -> FinancialDataResponse:
+    """
+        Convert a frame of closing prices back to the pydantic financial data, the missing values are skipped.
+    """
+    dates = np.asarray(frame.index.strftime(DATE_FORMAT))
+    companies = []
+    for company in frame.columns:
+        closes = frame[company].to_numpy(dtype=float)
+        available = ~np.isnan(closes)
+        companies.append({
+            "company_name": str(company),
+            "financial_data": [
+                {"date": date, "metrics": {"Close": close}}
+                for date, close in zip(dates[available].tolist(), closes[available].tolist())
+            ],
+        })
+    # Validating the plain dicts in one go is much faster than building the objects one by one
+    return FinancialDataResponse.model_validate({"companies_financial_data": companies})
+
+
+def to_chart_data(frame: pd.DataFrame, decimals: int = 2) -> str:
+    """
+        Serialize a frame of closing prices as compact columnar JSON for the charts: the dates once,
+        then one array of values per company (null for the missing values).
+    """
+    values = frame.round(decimals).astype(object).where(frame.notna(), None)
+    return json.dumps({
+        "dates": frame.index.strftime(DATE_FORMAT).tolist(),
+        "series": {str(company): values[company].tolist() for company in frame.columns},
+    })
+
+
+def rebase(frame: pd.DataFrame, base: float = 100.0) -> pd.DataFrame:
+    "Normalize every series to `base` at its first available closing price, to compare the companies performance"
+    return frame / frame.bfill().iloc[0] * base
+
+
+def returns(frame: pd.DataFrame) -> pd.DataFrame:
+    "Period over period returns of the closing prices"
+    return frame.pct_change(fill_method=None)
+
+
+def comparison_summary(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+        Compare the companies over the period.
+
+        Returns:
+            pd.DataFrame: One row per company with the first/last dates and closing prices, the change (in %),
+                          the min/max closing prices and the volatility (standard deviation of the returns, in %).
+    """
+    first_dates = frame.apply(pd.Series.first_valid_index)
+    last_dates = frame.apply(pd.Series.last_valid_index)
+    first = frame.bfill().iloc[0] if len(frame) else pd.Series(np.nan, index=frame.columns)
+    last = frame.ffill().iloc[-1] if len(frame) else pd.Series(np.nan, index=frame.columns)
+    return pd.DataFrame({
+        "first_date": first_dates,
+        "last_date": last_dates,
+        "first_close": first,
+        "last_close": last,
+        "change_pct": (last / first - 1) * 100,
+        "min_close": frame.min(),
+        "max_close": frame.max(),
+        "volatility_pct": returns(frame).std() * 100,
+    })
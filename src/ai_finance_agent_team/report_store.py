@@ -0,0 +1,161 @@
+import os
+import gzip
+import hashlib
+import threading
+from typing import List, Optional, Tuple
+
+
+
+# Default limits for the report artifact store
+
+DEFAULT_REPORTS_DIR = "./storage/reports"
+DEFAULT_MAX_REPORTS = 100
+DEFAULT_MAX_TOTAL_BYTES = 50 * 1024 * 1024     # compressed bytes kept on disk
+DEFAULT_MAX_HTML_BYTES = 5 * 1024 * 1024       # uncompressed size of a single report
+
+REPORT_SUFFIX = ".html.gz"
+
+
+class ReportTooLargeError(ValueError):
+    "Raised when a generated report exceeds the configured html size limit"
+
+
+class ReportStore:
+    """
+        Disk-backed store for the generated html reports.
+
+        Each report is written once, gzip compressed, under an id derived from its content.
+        Only the id needs to be kept in memory (e.g. in the Streamlit session state), the html is
+        read back from disk when it has to be displayed or downloaded. Streamlit keeps its own copy
+        of what is displayed and downloaded while the session shows it, which the store does not cover.
+        The least recently used reports are evicted once `max_reports` or `max_total_bytes` is exceeded.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_REPORTS_DIR,
+        max_reports: int = DEFAULT_MAX_REPORTS,
+        max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES,
+        max_html_bytes: int = DEFAULT_MAX_HTML_BYTES,
+        suffix: str = REPORT_SUFFIX,
+    ):
+        self.directory = directory
+        self.suffix = suffix
+        self.max_reports = max_reports
+        self.max_total_bytes = max_total_bytes
+        self.max_html_bytes = max_html_bytes
+        self._lock = threading.Lock()
+
+
+    def _path(self, report_id: str) -> str:
+        # Ids are hex digests, refuse anything else so that a tampered id cannot escape the directory
+        if not report_id or not all(c in "0123456789abcdef" for c in report_id):
+            raise KeyError(f"Invalid report id: {report_id!r}")
+        return os.path.join(self.directory, report_id + self.suffix)
+
+
+    def put(self, html: str) -> str:
+        """
+            Store an html report and return its id.
+
+            Args:
+                html (str): The html code of the report.
+
+            Returns:
+                str: The id to use to read the report back.
+        """
+        data = html.encode("utf-8")
+        if len(data) > self.max_html_bytes:
+            raise ReportTooLargeError(
+                f"Report is {len(data)} bytes, the limit is {self.max_html_bytes} bytes"
+            )
+
+        report_id = hashlib.sha256(data).hexdigest()[:32]
+        path = self._path(report_id)
+
+        with self._lock:
+            if os.path.exists(path):
+                # Same content already stored, just mark it as recently used
+                os.utime(path)
+            else:
+                # The directory is only created when the first report is stored
+                os.makedirs(self.directory, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with gzip.open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            self._evict(keep=path)
+
+        return report_id
+
+
+    def open(self, report_id: str):
+        """
+            Open a stored report as a file object.
+
+            Returns:
+                A binary file object yielding the decompressed html, to be closed by the caller.
+        """
+        path = self._path(report_id)
+        try:
+            os.utime(path)
+            return gzip.open(path, "rb")
+        except FileNotFoundError:
+            raise KeyError(f"Report {report_id} not found (it may have been evicted)")
+
+
+    def read(self, report_id: str) -> str:
+        "Read a stored report and return its html code"
+        with self.open(report_id) as f:
+            return f.read().decode("utf-8")
+
+
+    def exists(self, report_id: str) -> bool:
+        try:
+            return os.path.exists(self._path(report_id))
+        except KeyError:
+            return False
+
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            # Nothing stored yet
+            return entries
+        for name in names:
+            if not name.endswith(self.suffix):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+
+    def total_bytes(self) -> int:
+        "Total compressed size of the stored reports"
+        return sum(size for _, size, _ in self._entries())
+
+
+    def _evict(self, keep: Optional[str] = None):
+        # Least recently used first (the access time is tracked through the file mtime)
+        entries = sorted(self._entries())
+        count = len(entries)
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if count <= self.max_reports and total <= self.max_total_bytes:
+                break
+            if path == keep:
+                # Never evict the report that was just stored
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            count -= 1
+            total -= size
@@ -1,7 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-import yfinance as yf
+from agno.tools.duckduckgo import DuckDuckGoTools
+
+from market_data import get_market_data_provider
 
 
 
@@ -103,9 +105,69 @@ def get_historical_prices(symbol: str, period: int = 6):
     interval = interval_mapping[period_str]
 
     try:
-        stock = yf.Ticker(symbol)
-        historical_price = stock.history(period=period_str, interval=interval)
+        # Yahoo Finance by default, see market_data.py for the offline providers
+        historical_price = get_market_data_provider().history(symbol, period=period_str, interval=interval)
         return historical_price.to_json(orient="index", date_format="iso")
     
     except Exception as e:
         raise ValueError(f"Error fetching historical data for {symbol}: {e}")
+
+
+
+class CachedDuckDuckGoTools(DuckDuckGoTools):
+    """
+        DuckDuckGo toolkit whose search results go through a cache (see data_cache.DataCache).
+
+        `refresh(name, **kwargs)` runs a search and stores its result regardless of the cache state,
+        it is used by the warm-up scheduler.
+    """
+
+    def __init__(self, cache: Optional[object] = None, **kwargs):
+        self.search_cache = cache
+        super().__init__(**kwargs)
+
+
+    def _search(self, name: str, **kwargs) -> str:
+        if self.search_cache is None:
+            return self.refresh(name, **kwargs)
+        cached = self.search_cache.lookup(self.search_cache.make_key(name, **kwargs))
+        if cached is not None:
+            return cached
+        return self.refresh(name, **kwargs)
+
+
+    def refresh(self, name: str, **kwargs) -> str:
+        kwargs.setdefault("max_results", 5)
+        function = getattr(super(), name)
+        result = function(**kwargs)
+        if self.search_cache is not None:
+            self.search_cache.set(self.search_cache.make_key(name, **kwargs), result)
+        return result
+
+
+    def duckduckgo_search(self, query: str, max_results: int = 5) -> str:
+        """
+            Use this function to search DuckDuckGo for a query.
+
+            Args:
+                query (str): The query to search for.
+                max_results (int): The maximum number of results to return. Defaults to 5.
+
+            Returns:
+                str: The result from DuckDuckGo.
+        """
+        return self._search("duckduckgo_search", query=query, max_results=max_results)
+
+
+    def duckduckgo_news(self, query: str, max_results: int = 5) -> str:
+        """
+            Use this function to get the latest news from DuckDuckGo.
+
+            Args:
+                query (str): The query to search for.
+                max_results (int): The maximum number of results to return. Defaults to 5.
+
+            Returns:
+                str: The latest news from DuckDuckGo.
+        """
+        return self._search("duckduckgo_news", query=query, max_results=max_results)
@@ -0,0 +1,264 @@
+import os
+import json
+import sqlite3
+import logging
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from agent_team import cached_get_historical_prices, web_tools
+
+
+logger = logging.getLogger(__name__)
+
+
+# Warm-up defaults: the US market opens at 09:30 New York time
+
+DEFAULT_WARMUP_TIME = "09:00"
+DEFAULT_WARMUP_TIMEZONE = "America/New_York"
+DEFAULT_WARMUP_PERIODS = (3,)
+DEFAULT_WARMUP_MAX_WORKERS = 4
+DEFAULT_WARMUP_TOP_N = 20
+
+AGENTS_DB_FILE = "./storage/team_database.db"
+AGENTS_TABLES = ("finance_agent", "web_agent")
+
+# Tools whose results are cached, and can then be warmed up
+WARMABLE_TOOLS = ("get_historical_prices", "duckduckgo_search", "duckduckgo_news")
+
+Task = Tuple[str, Dict]
+
+
+def load_watchlist(path: str) -> List[str]:
+    """
+        Load the watchlist file: one ticker symbol per line, empty lines and lines starting with # are ignored.
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def _iter_tool_calls(data):
+    # Walk the agent memory and yield the tool calls, in the agno format (tool_name/tool_args)
+    # as well as in the OpenAI messages format (function name/arguments)
+    if isinstance(data, dict):
+        if isinstance(data.get("tool_name"), str) and isinstance(data.get("tool_args"), dict):
+            yield data["tool_name"], data["tool_args"]
+        function = data.get("function")
+        if isinstance(function, dict) and isinstance(function.get("name"), str):
+            arguments = function.get("arguments")
+            if isinstance(arguments, str):
+                try:
+                    arguments = json.loads(arguments)
+                except json.JSONDecodeError:
+                    arguments = None
+            if isinstance(arguments, dict):
+                yield function["name"], arguments
+        for value in data.values():
+            yield from _iter_tool_calls(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from _iter_tool_calls(value)
+
+
+def mine_tool_calls(db_file: str = AGENTS_DB_FILE, tables: Iterable[str] = AGENTS_TABLES, limit: int = DEFAULT_WARMUP_TOP_N) -> List[Task]:
+    """
+        Find the most frequent warmable tool calls (historical prices and news searches) in the agents storage.
+
+        Args:
+            db_file (str): The SQLite database of the agents storage.
+            tables (Iterable[str]): The agents storage tables to mine.
+            limit (int): The maximum number of tool calls to return.
+
+        Returns:
+            List[Tuple[str, Dict]]: The (tool name, arguments) pairs, most frequent first.
+    """
+    counter = Counter()
+    if not os.path.exists(db_file):
+        return []
+
+    conn = sqlite3.connect(db_file, timeout=30)
+    try:
+        for table in tables:
+            try:
+                rows = conn.execute(f"SELECT * FROM {table}").fetchall()
+            except sqlite3.OperationalError:
+                # The agent has not been run yet
+                continue
+            for row in rows:
+                for value in row:
+                    if not isinstance(value, str) or not value.startswith(("{", "[")):
+                        continue
+                    try:
+                        data = json.loads(value)
+                    except json.JSONDecodeError:
+                        continue
+                    for name, arguments in _iter_tool_calls(data):
+                        if name in WARMABLE_TOOLS:
+                            counter[(name, json.dumps(arguments, sort_keys=True))] += 1
+    finally:
+        conn.close()
+
+    return [(name, json.loads(arguments)) for (name, arguments), _ in counter.most_common(limit)]
+
+
+def build_tasks(
+    watchlist: Iterable[str] = (),
+    periods: Iterable[int] = DEFAULT_WARMUP_PERIODS,
+    db_file: Optional[str] = AGENTS_DB_FILE,
+    top_n: int = DEFAULT_WARMUP_TOP_N,
+) -> List[Task]:
+    """
+        Build the list of the tool calls to warm up, from the watchlist and the most frequent past calls.
+
+        The watchlist only warms up the historical prices: the news queries are written by the Web Agent
+        (e.g. "Apple latest news"), so a query made from the ticker would hardly ever be a cache hit.
+        The news searches warmed up are the ones the agent actually sent, mined from its storage.
+    """
+    tasks = []
+    for symbol in watchlist:
+        for period in periods:
+            tasks.append(("get_historical_prices", {"symbol": symbol, "period": period}))
+    if db_file and top_n > 0:
+        tasks.extend(mine_tool_calls(db_file, limit=top_n))
+
+    # Remove the duplicates, keeping the order
+    unique_tasks = {}
+    for name, arguments in tasks:
+        unique_tasks.setdefault((name, json.dumps(arguments, sort_keys=True)), (name, arguments))
+    return list(unique_tasks.values())
+
+
+def run_task(task: Task) -> str:
+    "Run a tool call and refresh its cached result"
+    name, arguments = task
+    if name == "get_historical_prices":
+        return cached_get_historical_prices.refresh(**arguments)
+    return web_tools.refresh(name, **arguments)
+
+
+def warm_up(tasks: List[Task], max_workers: int = DEFAULT_WARMUP_MAX_WORKERS) -> int:
+    """
+        Refresh the caches for the given tool calls, with at most `max_workers` calls at the same time.
+
+        Returns:
+            int: The number of tool calls that succeeded.
+    """
+    def _run(task: Task) -> bool:
+        try:
+            run_task(task)
+            return True
+        except Exception as e:
+            logger.warning(f"Warm-up of {task[0]} {task[1]} failed: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        succeeded = sum(executor.map(_run, tasks))
+    logger.info(f"Warm-up done: {succeeded}/{len(tasks)} tool calls refreshed")
+    return succeeded
+
+
+class WarmupScheduler(threading.Thread):
+    """
+        Background thread refreshing the prices and news caches every weekday ahead of market open.
+    """
+
+    def __init__(
+        self,
+        watchlist_file: Optional[str] = None,
+        at: str = DEFAULT_WARMUP_TIME,
+        timezone: str = DEFAULT_WARMUP_TIMEZONE,
+        periods: Iterable[int] = DEFAULT_WARMUP_PERIODS,
+        max_workers: int = DEFAULT_WARMUP_MAX_WORKERS,
+        top_n: int = DEFAULT_WARMUP_TOP_N,
+        db_file: Optional[str] = AGENTS_DB_FILE,
+        run_on_start: bool = False,
+    ):
+        super().__init__(name="warmup-scheduler", daemon=True)
+        self.watchlist_file = watchlist_file
+        hour, minute = at.split(":")
+        self.hour, self.minute = int(hour), int(minute)
+        self.timezone = ZoneInfo(timezone)
+        self.periods = tuple(periods)
+        self.max_workers = max_workers
+        self.top_n = top_n
+        self.db_file = db_file
+        self.run_on_start = run_on_start
+        self._stop_event = threading.Event()
+
+
+    @classmethod
+    def from_env(cls) -> "WarmupScheduler":
+        "Create a scheduler configured by the WARMUP_* environment variables"
+        return cls(
+            watchlist_file=os.getenv("WARMUP_WATCHLIST"),
+            at=os.getenv("WARMUP_TIME", DEFAULT_WARMUP_TIME),
+            timezone=os.getenv("WARMUP_TIMEZONE", DEFAULT_WARMUP_TIMEZONE),
+            periods=[int(p) for p in os.getenv("WARMUP_PERIODS", "3").split(",")],
+            max_workers=int(os.getenv("WARMUP_MAX_WORKERS", DEFAULT_WARMUP_MAX_WORKERS)),
+            top_n=int(os.getenv("WARMUP_TOP_N", DEFAULT_WARMUP_TOP_N)),
+            run_on_start=os.getenv("WARMUP_ON_START", "false").lower() == "true",
+        )
+
+
+    def next_run(self, now: Optional[datetime] = None) -> datetime:
+        "Next weekday at the warm-up time, in the scheduler timezone"
+        now = now.astimezone(self.timezone) if now else datetime.now(self.timezone)
+        run = now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        if run <= now:
+            run += timedelta(days=1)
+        while run.weekday() >= 5:
+            run += timedelta(days=1)
+        return run
+
+
+    def run_once(self) -> int:
+        watchlist = load_watchlist(self.watchlist_file) if self.watchlist_file else []
+        tasks = build_tasks(watchlist, self.periods, self.db_file, self.top_n)
+        return warm_up(tasks, self.max_workers)
+
+
+    def _run_once_safely(self):
+        # A failed warm-up (e.g. a missing watchlist file) must not stop the scheduler thread
+        try:
+            self.run_once()
+        except Exception as e:
+            logger.warning(f"Warm-up failed: {e}")
+
+
+    def run(self):
+        if self.run_on_start:
+            self._run_once_safely()
+        while True:
+            delay = (self.next_run() - datetime.now(self.timezone)).total_seconds()
+            if self._stop_event.wait(max(delay, 0)):
+                return
+            self._run_once_safely()
+
+
+    def stop(self):
+        self._stop_event.set()
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm up the prices and news caches for the popular tickers")
+    parser.add_argument("--once", action="store_true", help="Run the warm-up once and exit instead of scheduling it")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    scheduler = WarmupScheduler.from_env()
+    if args.once:
+        scheduler.run_once()
+    else:
+        scheduler.run_on_start = True
+        scheduler.start()
+        scheduler.join()
+
+
+if __name__ == "__main__":
+    main()
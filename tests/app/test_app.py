@@ -1,8 +1,9 @@
 import pytest
 from unittest.mock import patch, MagicMock
 
-from src.ai_finance_agent_team.app import generate_report, main as streamlit_main
+from src.ai_finance_agent_team.app import generate_report, display_report, main as streamlit_main
 from src.ai_finance_agent_team.tools import ManagerResponse
+from src.ai_finance_agent_team.report_store import ReportStore
 from datetime import datetime
 
 @pytest.fixture
@@ -73,14 +74,63 @@ def test_generate_report_error(mock_st):
         mock_st.progress.return_value.progress.assert_called_with(100) # Should be set to 100 in except block
         mock_st.empty.return_value.text.assert_called_with(f"Error generating report: {error_message}") 
 
+def test_generate_report_fan_out(mock_st, monkeypatch):
+    """
+    Tests that generate_report runs one sub-run per company when the fan-out mode is enabled.
+    """
+    monkeypatch.setenv("FAN_OUT_ENABLED", "true")
+    expected_html = "<h1>Fan-out Report</h1>"
+
+    with patch('src.ai_finance_agent_team.app.run_fan_out', return_value=ManagerResponse(complete_page_html_code=expected_html)) as mock_run_fan_out, \
+         patch('src.ai_finance_agent_team.app.manager_agent.run') as mock_run_manager:
+        actual_html = generate_report("Apple, Microsoft", 3)
+
+        mock_run_fan_out.assert_called_once_with("Apple, Microsoft", 3)
+        mock_run_manager.assert_not_called()
+        assert actual_html == expected_html
+
+def test_generate_report_delta(mock_st, monkeypatch, tmp_path):
+    """
+    Tests that generate_report keeps the report session in the store and reuses it for the follow-up request.
+    """
+    from src.ai_finance_agent_team.delta import ReportSession
+
+    monkeypatch.setenv("DELTA_REPORTS_ENABLED", "true")
+    mock_st.session_state = {}
+    first_session = ReportSession(period=3, analyses=[], report_html="<h1>First</h1>")
+    second_session = ReportSession(period=6, analyses=[], report_html="<h1>Second</h1>")
+
+    report_store = ReportStore(directory=str(tmp_path / "reports"))
+    session_store = ReportStore(directory=str(tmp_path / "sessions"), suffix=".json.gz")
+
+    with patch('src.ai_finance_agent_team.app.get_report_store', return_value=report_store), \
+         patch('src.ai_finance_agent_team.app.get_session_store', return_value=session_store), \
+         patch('src.ai_finance_agent_team.app.run_delta') as mock_run_delta, \
+         patch('src.ai_finance_agent_team.app.manager_agent.run') as mock_run_manager:
+        mock_run_delta.return_value = (ManagerResponse(complete_page_html_code="<h1>First</h1>"), first_session)
+        assert generate_report("Apple", 3) == "<h1>First</h1>"
+        mock_run_delta.assert_called_with("Apple", 3, None)
+
+        mock_run_delta.return_value = (ManagerResponse(complete_page_html_code="<h1>Second</h1>"), second_session)
+        assert generate_report("Apple", 6) == "<h1>Second</h1>"
+        mock_run_delta.assert_called_with("Apple", 6, first_session)
+
+        mock_run_manager.assert_not_called()
+
+    # The sessions do not count against the reports quota
+    assert report_store.total_bytes() == 0
+    assert session_store.total_bytes() > 0
+
 @pytest.fixture
-def mock_st_for_main_function():
+def mock_st_for_main_function(tmp_path):
     """Mocks streamlit UI components used in the main() function of app.py."""
     # Path to streamlit in app.py is 'src.ai_finance_agent_team.app.st'
     # Path to components in app.py is 'src.ai_finance_agent_team.app.components'
+    # Reports are stored in a temporary directory instead of ./storage/reports
     with patch('src.ai_finance_agent_team.app.st') as mock_st_instance, \
          patch('src.ai_finance_agent_team.app.components') as mock_components_instance, \
-         patch('src.ai_finance_agent_team.app.generate_report') as mock_generate_report:
+         patch('src.ai_finance_agent_team.app.generate_report') as mock_generate_report, \
+         patch('src.ai_finance_agent_team.app.get_report_store', return_value=ReportStore(directory=str(tmp_path), max_html_bytes=1024)):
 
         mock_st_instance.set_page_config = MagicMock()
         mock_st_instance.title = MagicMock()
@@ -146,6 +196,56 @@ def test_main_app_form_submission_success(mock_st_for_main_function):
 
     mock_st.error.assert_not_called()
 
+def test_display_report_download_data_format(tmp_path):
+    """
+    Tests that the download button gets data in a format accepted by Streamlit.
+    """
+    from streamlit.elements.widgets.button import marshall_file
+    from streamlit.proto.DownloadButton_pb2 import DownloadButton as DownloadButtonProto
+
+    store = ReportStore(directory=str(tmp_path))
+    report_id = store.put("<p>Stored report</p>")
+
+    with patch('src.ai_finance_agent_team.app.st') as mock_st, \
+         patch('src.ai_finance_agent_team.app.components'), \
+         patch('src.ai_finance_agent_team.app.get_report_store', return_value=store):
+        display_report(report_id)
+
+    data = mock_st.download_button.call_args[1]['data']
+    # Raises RuntimeError for the data types Streamlit cannot serve
+    marshall_file("download_button", data, DownloadButtonProto(), "text/html", "report.html")
+
+def test_display_report_evicted(tmp_path):
+    """
+    Tests that a report evicted by another session is dropped from the session instead of crashing the page.
+    """
+    with patch('src.ai_finance_agent_team.app.st') as mock_st, \
+         patch('src.ai_finance_agent_team.app.components') as mock_components, \
+         patch('src.ai_finance_agent_team.app.get_report_store', return_value=ReportStore(directory=str(tmp_path))):
+        mock_st.session_state = {"report_id": "0123abcd"}
+        display_report("0123abcd")
+
+    assert "report_id" not in mock_st.session_state
+    mock_st.warning.assert_called_once()
+    mock_components.html.assert_not_called()
+    mock_st.download_button.assert_not_called()
+
+def test_main_app_form_submission_report_too_large(mock_st_for_main_function):
+    """
+    Tests the main app flow when the generated report exceeds the store html size limit.
+    """
+    mock_st, mock_components, mock_generate_report_func = mock_st_for_main_function
+
+    mock_st.form_submit_button.return_value = True
+    mock_generate_report_func.return_value = "<p>" + "x" * 2048 + "</p>"
+
+    streamlit_main()
+
+    mock_st.error.assert_called_once()
+    assert "too large" in mock_st.error.call_args[0][0]
+    mock_components.html.assert_not_called()
+    mock_st.download_button.assert_not_called()
+
 def test_main_app_form_submission_no_companies(mock_st_for_main_function):
     """
     Tests the main app flow when form is submitted but no companies are entered.
@@ -0,0 +1,46 @@
+import os
+import sys
+import importlib
+import importlib.abc
+import importlib.util
+
+import pytest
+
+# The app modules import each other by their bare names (`from tools import *`), as when running
+# `streamlit run app.py` from src/ai_finance_agent_team, while the tests import them as `src.ai_finance_agent_team.X`.
+# Both names are mapped to the same module objects, so that the tests build and patch the very classes
+# and functions the app uses, instead of a second copy of every module.
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "ai_finance_agent_team")
+APP_PACKAGE = "src.ai_finance_agent_team."
+
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+
+class AppModuleAliasFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    "Resolve `src.ai_finance_agent_team.X` to the module imported by the app as `X`"
+
+    def find_spec(self, fullname, path, target=None):
+        if not fullname.startswith(APP_PACKAGE):
+            return None
+        name = fullname[len(APP_PACKAGE):]
+        if "." in name or not os.path.exists(os.path.join(APP_DIR, f"{name}.py")):
+            return None
+        return importlib.util.spec_from_loader(fullname, self)
+
+    def create_module(self, spec):
+        return importlib.import_module(spec.name[len(APP_PACKAGE):])
+
+    def exec_module(self, module):
+        # Already executed when imported under its bare name
+        pass
+
+
+sys.meta_path.insert(0, AppModuleAliasFinder())
+
+
+@pytest.fixture(autouse=True)
+def storage_in_tmp_path(tmp_path, monkeypatch):
+    "The app keeps its reports and caches under ./storage, run every test from its own directory"
+    monkeypatch.chdir(tmp_path)
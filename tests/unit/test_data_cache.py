@@ -0,0 +1,114 @@
+import os
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.ai_finance_agent_team.data_cache import DataCache, DataCacheMiss, cached_tool
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DataCache(table_name="prices", ttl=60, db_file=str(tmp_path / "data_cache.db"))
+
+def test_cache_get_set(cache):
+    key = DataCache.make_key("get_historical_prices", symbol="AAPL", period=3)
+
+    assert cache.get(key) is None
+    cache.set(key, "{}")
+    assert cache.get(key) == "{}"
+
+def test_cache_ttl(cache):
+    with patch('src.ai_finance_agent_team.data_cache.time.time', return_value=1000.0):
+        cache.set("key", "value")
+    with patch('src.ai_finance_agent_team.data_cache.time.time', return_value=1061.0):
+        assert cache.get("key") is None
+
+def test_cached_tool(cache):
+    calls = []
+
+    def get_prices(symbol: str, period: int = 6) -> str:
+        "Get the prices"
+        calls.append((symbol, period))
+        return f"{symbol}-{period}"
+
+    tool = cached_tool(get_prices, cache)
+
+    assert tool("AAPL") == "AAPL-6"
+    # Positional, keyword and default arguments share the same entry
+    assert tool(symbol="AAPL", period=6) == "AAPL-6"
+    assert len(calls) == 1
+
+    assert tool("AAPL", 3) == "AAPL-3"
+    assert len(calls) == 2
+
+    # refresh always calls the function
+    tool.refresh(symbol="AAPL")
+    assert len(calls) == 3
+    assert tool("AAPL") == "AAPL-6"
+    assert len(calls) == 3
+
+def test_cached_tool_keeps_metadata(cache):
+    def get_prices(symbol: str, period: int = 6) -> str:
+        "Get the prices"
+        return symbol
+
+    tool = cached_tool(get_prices, cache)
+
+    assert tool.__name__ == "get_prices"
+    assert tool.__doc__ == "Get the prices"
+
+def test_cached_tool_errors_are_not_cached(cache):
+    mock_fetch = MagicMock(side_effect=[ValueError("error"), "ok"])
+
+    def get_prices(symbol: str) -> str:
+        return mock_fetch(symbol)
+
+    tool = cached_tool(get_prices, cache)
+
+    with pytest.raises(ValueError):
+        tool("FAIL")
+    assert tool("FAIL") == "ok"
+
+def test_cached_tool_namespace(cache):
+    namespace = MagicMock(return_value="yfinance")
+
+    def get_prices(symbol: str) -> str:
+        return f"{namespace.return_value}-{symbol}"
+
+    tool = cached_tool(get_prices, cache, namespace=namespace)
+
+    assert tool("AAPL") == "yfinance-AAPL"
+    # Another namespace does not get the cached result of the first one
+    namespace.return_value = "synthetic"
+    assert tool("AAPL") == "synthetic-AAPL"
+    namespace.return_value = "yfinance"
+    assert tool("AAPL") == "yfinance-AAPL"
+
+def test_cache_record_and_replay_modes(tmp_path):
+    db_file = str(tmp_path / "data_cache.db")
+    fetch = MagicMock(return_value="live")
+
+    def get_prices(symbol: str) -> str:
+        return fetch(symbol)
+
+    record_cache = DataCache(table_name="prices", ttl=60, db_file=db_file, mode="record")
+    with patch('src.ai_finance_agent_team.data_cache.time.time', return_value=1000.0):
+        # Record mode always fetches
+        cached_tool(get_prices, record_cache)("AAPL")
+        cached_tool(get_prices, record_cache)("AAPL")
+    assert fetch.call_count == 2
+
+    replay_tool = cached_tool(get_prices, DataCache(table_name="prices", ttl=60, db_file=db_file, mode="replay"))
+    fetch.reset_mock()
+    with patch('src.ai_finance_agent_team.data_cache.time.time', return_value=10000.0):
+        # Replay mode ignores the ttl and never fetches
+        assert replay_tool("AAPL") == "live"
+        with pytest.raises(DataCacheMiss):
+            replay_tool("MSFT")
+    fetch.assert_not_called()
+
+def test_database_created_on_first_use(tmp_path):
+    cache = DataCache(table_name="prices", ttl=60, db_file=str(tmp_path / "storage" / "data_cache.db"))
+
+    assert not os.path.exists(cache.db_file)
+    assert cache.get("key") is None
+    assert os.path.exists(cache.db_file)
@@ -0,0 +1,149 @@
+import time
+import pytest
+from unittest.mock import patch
+
+from src.ai_finance_agent_team import fan_out
+from src.ai_finance_agent_team.delta import plan_delta, run_delta, ReportSession
+from src.ai_finance_agent_team.fan_out import CompanyAnalysis
+from src.ai_finance_agent_team.agent_team import news_cache, price_cache
+from src.ai_finance_agent_team.tools import (
+    NewsList, News, FinancialDataList, DayFinancialData, StockMetric, ChartDataResponse, ManagerResponse
+)
+
+
+def make_analysis(company: str) -> CompanyAnalysis:
+    return CompanyAnalysis(
+        company_name=company,
+        news=NewsList(company_name=company, news=[News(title=f"{company} news", summary="S", source="U", analysis="A")]),
+        financial_data=FinancialDataList(company_name=company, financial_data=[
+            DayFinancialData(date="2023-01-01", metrics=StockMetric(Close=100.0)),
+        ]),
+        chart=ChartDataResponse(company_name=company, period="3", html_code=f"<div>{company}</div>"),
+    )
+
+@pytest.fixture
+def cache_ttls():
+    with patch.object(news_cache, 'ttl', 600), patch.object(price_cache, 'ttl', 60):
+        yield
+
+@pytest.fixture
+def previous_session():
+    return ReportSession(
+        period=3,
+        analyses=[make_analysis("Apple"), make_analysis("Microsoft")],
+        report_html="<html>Previous report</html>",
+    )
+
+def test_plan_delta_without_previous_session():
+    assert plan_delta(None, ["Apple"], 3) == {}
+
+def test_plan_delta_new_company(previous_session):
+    reuse = plan_delta(previous_session, ["Apple", "Microsoft", "Tesla"], 3)
+
+    assert set(reuse) == {"Apple", "Microsoft"}
+    assert reuse["Apple"] == previous_session.analyses[0]
+
+def test_plan_delta_period_change_reuses_news_only(previous_session):
+    reuse = plan_delta(previous_session, ["Apple"], 6)
+
+    assert reuse["Apple"].news == previous_session.analyses[0].news
+    assert reuse["Apple"].financial_data is None
+    assert reuse["Apple"].chart is None
+
+def test_run_delta_same_request(previous_session):
+    with patch('src.ai_finance_agent_team.delta.analyze_companies') as mock_analyze, \
+         patch('src.ai_finance_agent_team.delta.compose_report') as mock_compose:
+        response, session = run_delta("Apple, Microsoft", 3, previous_session)
+
+    mock_analyze.assert_not_called()
+    mock_compose.assert_not_called()
+    assert response.complete_page_html_code == "<html>Previous report</html>"
+    assert session is previous_session
+
+def test_run_delta_follow_up_request(previous_session):
+    analyses = [make_analysis("Apple"), make_analysis("Tesla")]
+    new_html = "<html>New report</html>"
+
+    with patch('src.ai_finance_agent_team.delta.analyze_companies', return_value=analyses) as mock_analyze, \
+         patch('src.ai_finance_agent_team.delta.compose_report', return_value=ManagerResponse(complete_page_html_code=new_html)) as mock_compose:
+        response, session = run_delta("Apple, Tesla", 3, previous_session)
+
+    names, period, reuse = mock_analyze.call_args[0]
+    assert names == ["Apple", "Tesla"]
+    assert period == 3
+    # Only Tesla gets a complete sub-run
+    assert set(reuse) == {"Apple"}
+    mock_compose.assert_called_once_with(analyses, 3)
+
+    assert response.complete_page_html_code == new_html
+    assert session.period == 3
+    assert [analysis.company_name for analysis in session.analyses] == ["Apple", "Tesla"]
+    assert session.report_html == new_html
+
+def test_run_delta_follow_up_rewrites_new_sections_only(previous_session):
+    previous_session.analyses = [make_analysis("Apple")]
+    for analysis in previous_session.analyses:
+        analysis.section_html = f"<section>{analysis.company_name} section</section>"
+        analysis.section_key = fan_out.section_key(analysis, 3)
+
+    def analyze(name, period, reuse=None):
+        return reuse or make_analysis(name)
+
+    with patch.object(fan_out, 'analyze_company', side_effect=analyze), \
+         patch.object(fan_out, 'create_comparison_chart', return_value=None), \
+         patch.object(fan_out, 'create_conclusion', return_value="") as mock_conclusion, \
+         patch.object(fan_out, 'create_section', return_value="<section>Tesla section</section>") as mock_section:
+        response, session = run_delta("Apple, Tesla", 3, previous_session)
+
+    # Only the section of the new company is written, plus the conclusion
+    mock_section.assert_called_once()
+    assert mock_section.call_args[0][0].company_name == "Tesla"
+    mock_conclusion.assert_called_once()
+    assert "<section>Apple section</section>" in response.complete_page_html_code
+    assert "<section>Tesla section</section>" in response.complete_page_html_code
+    assert session.analyses[1].section_key == fan_out.section_key(session.analyses[1], 3)
+
+def test_plan_delta_expired_previous_session(previous_session, cache_ttls):
+    now = previous_session.created_at
+
+    # The prices expire first: only the news are reused
+    reuse = plan_delta(previous_session, ["Apple"], 3, now=now + 120)
+    assert reuse["Apple"].news == previous_session.analyses[0].news
+    assert reuse["Apple"].financial_data is None
+    assert reuse["Apple"].chart is None
+
+    # Nothing is reused once the news have expired as well
+    assert plan_delta(previous_session, ["Apple"], 3, now=now + 1200) == {}
+
+def test_run_delta_same_request_expired(previous_session, cache_ttls):
+    previous_session.created_at = time.time() - 1200
+    analyses = [make_analysis("Apple"), make_analysis("Microsoft")]
+
+    with patch('src.ai_finance_agent_team.delta.analyze_companies', return_value=analyses) as mock_analyze, \
+         patch('src.ai_finance_agent_team.delta.compose_report', return_value=ManagerResponse(complete_page_html_code="<html>New</html>")):
+        response, session = run_delta("Apple, Microsoft", 3, previous_session)
+
+    # The whole report is generated again, with a new timestamp
+    assert mock_analyze.call_args[0][2] == {}
+    assert response.complete_page_html_code == "<html>New</html>"
+    assert session.created_at > previous_session.created_at
+
+def test_run_delta_keeps_age_of_reused_parts(previous_session, cache_ttls):
+    previous_session.created_at = time.time() - 60
+
+    with patch('src.ai_finance_agent_team.delta.analyze_companies', return_value=[make_analysis("Apple")]), \
+         patch('src.ai_finance_agent_team.delta.compose_report', return_value=ManagerResponse(complete_page_html_code="<html>New</html>")):
+        _, session = run_delta("Apple", 6, previous_session)
+
+    assert session.created_at == previous_session.created_at
+
+def test_analyze_company_reuses_previous_parts():
+    with patch.object(fan_out, 'create_web_agent') as mock_web, \
+         patch.object(fan_out, 'create_finance_agent') as mock_finance, \
+         patch.object(fan_out, 'create_dataviz_agent') as mock_dataviz:
+        analysis = fan_out.analyze_company("Apple", 3, reuse=make_analysis("Apple"))
+
+    mock_web.assert_not_called()
+    mock_finance.assert_not_called()
+    mock_dataviz.assert_not_called()
+    assert analysis == make_analysis("Apple")
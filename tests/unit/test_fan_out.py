@@ -0,0 +1,242 @@
+import threading
+from unittest.mock import patch, MagicMock
+
+from src.ai_finance_agent_team.fan_out import (
+    split_companies, summarize_financial_data, insert_charts, analyze_company, get_news, get_financial_data,
+    create_chart, create_comparison_chart, compose_report, run_fan_out, CompanyAnalysis
+)
+from src.ai_finance_agent_team.tools import (
+    NewsResponse, NewsList, News, FinancialDataResponse, FinancialDataList, DayFinancialData, StockMetric,
+    ChartDataResponse, FrontEndResponse, ManagerResponse
+)
+
+
+def make_financial_data(company: str) -> FinancialDataList:
+    return FinancialDataList(company_name=company, financial_data=[
+        DayFinancialData(date="2023-01-01", metrics=StockMetric(Close=100.0)),
+        DayFinancialData(date="2023-02-01", metrics=StockMetric(Close=110.0)),
+    ])
+
+def make_agent(content):
+    agent = MagicMock()
+    agent.run.return_value = MagicMock(content=content)
+    return agent
+
+def news_agent_factory():
+    def run(query):
+        company = query.rsplit(" ", 1)[-1]
+        news = News(title=f"{company} news", summary="S", source="U", analysis="A")
+        return MagicMock(content=NewsResponse(company_news=[NewsList(company_name=company, news=[news])]))
+    agent = MagicMock()
+    agent.run.side_effect = run
+    return agent
+
+def finance_agent_factory():
+    def run(query):
+        company = query.split("company ")[1].split(" over")[0]
+        return MagicMock(content=FinancialDataResponse(companies_financial_data=[make_financial_data(company)]))
+    agent = MagicMock()
+    agent.run.side_effect = run
+    return agent
+
+def dataviz_agent_factory():
+    def run(query):
+        if query.startswith("Create a chart comparing"):
+            return MagicMock(content=ChartDataResponse(company_name="Comparison", period="3", html_code="<canvas id='chart'>Comparison</canvas>"))
+        company = query.split("company ")[1].split(" over")[0]
+        return MagicMock(content=ChartDataResponse(company_name=company, period="3", html_code=f"<canvas id='chart'>{company}</canvas>"))
+    agent = MagicMock()
+    agent.run.side_effect = run
+    return agent
+
+def frontend_agent_factory():
+    def run(query):
+        if query.startswith("Write a short conclusion"):
+            return MagicMock(content=FrontEndResponse(html_code="<section>Conclusion</section>"))
+        company = query.split("Company: ")[1].split("\n")[0]
+        # Sections sometimes come as complete pages
+        return MagicMock(content=FrontEndResponse(html_code=f"<html><body><section>{company} {{{{chart:{company}}}}}</section></body></html>"))
+    agent = MagicMock()
+    agent.run.side_effect = run
+    return agent
+
+def test_split_companies():
+    assert split_companies("Apple, Microsoft,Tesla , ,Apple") == ["Apple", "Microsoft", "Tesla"]
+    assert split_companies("Apple") == ["Apple"]
+
+def test_summarize_financial_data():
+    summary = summarize_financial_data(make_financial_data("Apple"))
+
+    assert "first close 100.00" in summary
+    assert "last close 110.00" in summary
+    assert "change +10.00%" in summary
+
+def test_create_chart_sends_arrays():
+    dataviz_agent = make_agent(ChartDataResponse(company_name="Apple", period="3", html_code="<div></div>"))
+
+    with patch('src.ai_finance_agent_team.fan_out.create_dataviz_agent', return_value=dataviz_agent):
+        create_chart("Apple", 3, make_financial_data("Apple"))
+
+    query = dataviz_agent.run.call_args[0][0]
+    assert '{"dates": ["2023-01-01", "2023-02-01"], "series": {"Apple": [100.0, 110.0]}}' in query
+
+def test_create_comparison_chart_rebased():
+    dataviz_agent = make_agent(ChartDataResponse(company_name="Comparison", period="3", html_code="<div></div>"))
+    microsoft = FinancialDataList(company_name="Microsoft", financial_data=[
+        DayFinancialData(date="2023-01-01", metrics=StockMetric(Close=200.0)),
+        DayFinancialData(date="2023-02-01", metrics=StockMetric(Close=180.0)),
+    ])
+    analyses = [
+        CompanyAnalysis(company_name="Apple", financial_data=make_financial_data("Apple")),
+        CompanyAnalysis(company_name="Microsoft", financial_data=microsoft),
+    ]
+
+    with patch('src.ai_finance_agent_team.fan_out.create_dataviz_agent', return_value=dataviz_agent):
+        assert create_comparison_chart(analyses, 3) is not None
+        # A single company has nothing to be compared with
+        assert create_comparison_chart(analyses[:1], 3) is None
+
+    dataviz_agent.run.assert_called_once()
+    assert '"series": {"Apple": [100.0, 110.0], "Microsoft": [100.0, 90.0]}' in dataviz_agent.run.call_args[0][0]
+
+def test_summarize_financial_data_free_form_dates():
+    financial_data = FinancialDataList(company_name="Apple", financial_data=[
+        DayFinancialData(date="Jan 4, 2023", metrics=StockMetric(Close=100.0)),
+        DayFinancialData(date="Feb 1, 2023", metrics=StockMetric(Close=110.0)),
+    ])
+
+    assert "from 2023-01-04 to 2023-02-01" in summarize_financial_data(financial_data)
+
+    financial_data.financial_data[0].date = "start"
+    financial_data.financial_data[1].date = "end"
+    assert "from start to end: first close 100.00, last close 110.00" in summarize_financial_data(financial_data)
+
+def test_insert_charts():
+    analyses = [
+        CompanyAnalysis(company_name="Apple", chart=ChartDataResponse(company_name="Apple", period="3", html_code='<div id="c">"A"</div>')),
+        CompanyAnalysis(company_name="Tesla", chart=ChartDataResponse(company_name="Tesla", period="3", html_code="<div>T</div>")),
+        CompanyAnalysis(company_name="Nvidia"),
+    ]
+    page = "<html><body><h1>Report</h1>{{chart:Apple}}</body></html>"
+
+    result = insert_charts(page, analyses)
+
+    assert "{{chart:Apple}}" not in result
+    # Each chart is isolated in an iframe, the missing placeholder is appended at the end of the body
+    assert result.count("<iframe srcdoc=") == 2
+    assert "&lt;div id=&quot;c&quot;&gt;&quot;A&quot;&lt;/div&gt;" in result
+    assert result.index("&lt;div&gt;T&lt;/div&gt;") < result.index("</body>")
+
+def test_analyze_company():
+    with patch('src.ai_finance_agent_team.fan_out.create_web_agent', side_effect=news_agent_factory), \
+         patch('src.ai_finance_agent_team.fan_out.create_finance_agent', side_effect=finance_agent_factory), \
+         patch('src.ai_finance_agent_team.fan_out.create_dataviz_agent', side_effect=dataviz_agent_factory):
+        analysis = analyze_company("Apple", 3)
+
+    assert analysis.company_name == "Apple"
+    assert analysis.news.news[0].title == "Apple news"
+    assert analysis.financial_data.financial_data[-1].metrics.Close == 110.0
+    assert analysis.chart.html_code == "<canvas id='chart'>Apple</canvas>"
+
+def test_analyze_company_sub_run_failure():
+    failing_agent = MagicMock()
+    failing_agent.run.side_effect = Exception("Simulated agent error")
+
+    with patch('src.ai_finance_agent_team.fan_out.create_web_agent', side_effect=news_agent_factory), \
+         patch('src.ai_finance_agent_team.fan_out.create_finance_agent', return_value=failing_agent), \
+         patch('src.ai_finance_agent_team.fan_out.create_dataviz_agent', side_effect=dataviz_agent_factory) as mock_dataviz:
+        analysis = analyze_company("Apple", 3)
+
+    assert analysis.news is not None
+    assert analysis.financial_data is None
+    assert analysis.chart is None
+    mock_dataviz.assert_not_called()
+
+def test_sub_run_unparsed_content():
+    # agno hands back the raw text when the structured output cannot be parsed
+    with patch('src.ai_finance_agent_team.fan_out.create_web_agent', return_value=make_agent("Not a NewsResponse")), \
+         patch('src.ai_finance_agent_team.fan_out.create_finance_agent', return_value=make_agent("Not a FinancialDataResponse")):
+        assert get_news("Apple") is None
+        assert get_financial_data("Apple", 3) is None
+
+def test_analyze_company_unparsed_news():
+    with patch('src.ai_finance_agent_team.fan_out.create_web_agent', return_value=make_agent("Not a NewsResponse")), \
+         patch('src.ai_finance_agent_team.fan_out.create_finance_agent', side_effect=finance_agent_factory), \
+         patch('src.ai_finance_agent_team.fan_out.create_dataviz_agent', side_effect=dataviz_agent_factory):
+        analysis = analyze_company("Apple", 3)
+
+    assert analysis.news is None
+    assert analysis.chart is not None
+
+def test_run_fan_out_runs_companies_concurrently():
+    companies = ["Apple", "Microsoft", "Tesla"]
+    # Every finance sub-run waits for the others, which only succeeds if they run at the same time
+    barrier = threading.Barrier(len(companies), timeout=5)
+
+    def concurrent_finance_agent_factory():
+        agent = finance_agent_factory()
+        run = agent.run.side_effect
+        def wait_and_run(query):
+            barrier.wait()
+            return run(query)
+        agent.run.side_effect = wait_and_run
+        return agent
+
+    frontend_agent = frontend_agent_factory()
+
+    with patch('src.ai_finance_agent_team.fan_out.create_web_agent', side_effect=news_agent_factory), \
+         patch('src.ai_finance_agent_team.fan_out.create_finance_agent', side_effect=concurrent_finance_agent_factory), \
+         patch('src.ai_finance_agent_team.fan_out.create_dataviz_agent', side_effect=dataviz_agent_factory), \
+         patch('src.ai_finance_agent_team.fan_out.create_frontend_agent', return_value=frontend_agent):
+        response = run_fan_out(", ".join(companies), 3)
+
+    assert isinstance(response, ManagerResponse)
+    # One chart per company, and the comparison chart
+    assert response.complete_page_html_code.count("<iframe srcdoc=") == 4
+    assert "Comparison" in response.complete_page_html_code
+    assert "{{chart:" not in response.complete_page_html_code
+    assert response.complete_page_html_code.count("<body>") == 1
+    assert response.complete_page_html_code.index("<section>Conclusion</section>") > response.complete_page_html_code.index("Tesla")
+
+    # One section per company, and the conclusion
+    frontend_queries = [call[0][0] for call in frontend_agent.run.call_args_list]
+    assert len(frontend_queries) == len(companies) + 1
+    for company in companies:
+        assert any(f"Company: {company}" in query and f"{{{{chart:{company}}}}}" in query for query in frontend_queries)
+
+def test_compose_report_rewrites_changed_sections_only():
+    analyses = [
+        CompanyAnalysis(company_name=company, financial_data=make_financial_data(company),
+                        chart=ChartDataResponse(company_name=company, period="3", html_code=f"<div>{company}</div>"))
+        for company in ["Apple", "Microsoft"]
+    ]
+    frontend_agent = frontend_agent_factory()
+
+    with patch('src.ai_finance_agent_team.fan_out.create_dataviz_agent', side_effect=dataviz_agent_factory), \
+         patch('src.ai_finance_agent_team.fan_out.create_frontend_agent', return_value=frontend_agent):
+        compose_report(analyses, 3)
+        assert all(analysis.section_html and analysis.section_key for analysis in analyses)
+        frontend_agent.run.reset_mock()
+
+        # New prices for Microsoft only: its section and the conclusion are written again
+        analyses[1].financial_data.financial_data[-1].metrics.Close = 90.0
+        response = compose_report(analyses, 3)
+
+    frontend_queries = [call[0][0] for call in frontend_agent.run.call_args_list]
+    assert len(frontend_queries) == 2
+    assert any("Company: Microsoft" in query for query in frontend_queries)
+    assert not any("Company: Apple" in query for query in frontend_queries)
+    assert "<section>Apple" in response.complete_page_html_code
+
+def test_compose_report_section_failure():
+    analyses = [CompanyAnalysis(company_name="Apple", chart=ChartDataResponse(company_name="Apple", period="3", html_code="<div>A</div>"))]
+    failing_agent = MagicMock()
+    failing_agent.run.side_effect = Exception("Simulated agent error")
+
+    with patch('src.ai_finance_agent_team.fan_out.create_frontend_agent', return_value=failing_agent):
+        response = compose_report(analyses, 3)
+
+    # The chart is still in the page, and the section is not stored so that the next report writes it again
+    assert response.complete_page_html_code.count("<iframe srcdoc=") == 1
+    assert analyses[0].section_html is None
+    assert analyses[0].section_key is None
@@ -0,0 +1,182 @@
+import os
+import pytest
+from unittest.mock import patch, MagicMock
+
+from openai.types.chat import ChatCompletion
+from agno.agent import Agent
+from agno.models.message import Message
+from agno.models.openai import OpenAIChat
+
+from src.ai_finance_agent_team.llm_cache import LLMCache, LLMCacheMiss, CachedOpenAIChat
+from src.ai_finance_agent_team.data_cache import DataCache, cached_tool
+from src.ai_finance_agent_team.tools import FrontEndResponse
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    return str(tmp_path / "llm_cache.db")
+
+def make_completion(content: str) -> ChatCompletion:
+    return ChatCompletion.model_validate({
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o",
+        "choices": [{
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": content},
+        }],
+    })
+
+def test_make_key_depends_on_request():
+    messages = [{"role": "system", "content": "instructions"}, {"role": "user", "content": "AAPL"}]
+    request_kwargs = {"response_format": FrontEndResponse}
+    key = LLMCache.make_key("gpt-4o", messages, request_kwargs)
+
+    assert key == LLMCache.make_key("gpt-4o", list(messages), dict(request_kwargs))
+    assert key != LLMCache.make_key("gpt-4o-mini", messages, request_kwargs)
+    assert key != LLMCache.make_key("gpt-4o", messages[:1], request_kwargs)
+    assert key != LLMCache.make_key("gpt-4o", messages)
+    for name, value in [("tools", [{"type": "function"}]), ("tool_choice", "auto"), ("temperature", 0.2), ("seed", 42)]:
+        assert key != LLMCache.make_key("gpt-4o", messages, {**request_kwargs, name: value})
+
+def test_cached_model_key_depends_on_request_kwargs(db_file):
+    cache = LLMCache(db_file=db_file)
+    messages = [Message(role="user", content="Create a chart for AAPL")]
+
+    key = CachedOpenAIChat(id="gpt-4o", cache=cache)._cache_key(messages)
+
+    assert key != CachedOpenAIChat(id="gpt-4o", cache=cache, temperature=0.2)._cache_key(messages)
+    assert key != CachedOpenAIChat(id="gpt-4o", cache=cache, seed=42)._cache_key(messages)
+
+def test_cache_get_set(db_file):
+    cache = LLMCache(db_file=db_file)
+
+    assert cache.get("key") is None
+    cache.set("key", "gpt-4o", "response")
+    assert cache.get("key") == "response"
+
+def test_cache_ttl(db_file):
+    cache = LLMCache(db_file=db_file, ttl=10)
+    with patch('src.ai_finance_agent_team.llm_cache.time.time', return_value=1000.0):
+        cache.set("key", "gpt-4o", "response")
+    with patch('src.ai_finance_agent_team.llm_cache.time.time', return_value=1020.0):
+        assert cache.get("key") is None
+        # Replay mode ignores the ttl
+        assert LLMCache(db_file=db_file, ttl=10, mode="replay").get("key") == "response"
+        assert cache.clear_expired() == 1
+
+def test_cache_record_and_replay_modes(db_file):
+    record_cache = LLMCache(db_file=db_file, mode="record")
+    record_cache.set("key", "gpt-4o", "response")
+    # Record mode always calls the model
+    assert record_cache.get("key") is None
+
+    replay_cache = LLMCache(db_file=db_file, mode="replay")
+    assert replay_cache.get("key") == "response"
+    replay_cache.set("other", "gpt-4o", "response")
+    assert replay_cache.get("other") is None
+
+def test_cache_database_created_on_first_use(tmp_path):
+    cache = LLMCache(db_file=str(tmp_path / "storage" / "llm_cache.db"))
+
+    assert not os.path.exists(cache.db_file)
+    assert cache.get("key") is None
+    assert os.path.exists(cache.db_file)
+
+def test_cache_invalid_mode(db_file):
+    with pytest.raises(ValueError):
+        LLMCache(db_file=db_file, mode="invalid")
+
+def test_cached_model_skips_generation_on_hit(db_file):
+    model = CachedOpenAIChat(id="gpt-4o", cache=LLMCache(db_file=db_file))
+    messages = [Message(role="user", content="Create a chart for AAPL")]
+
+    with patch.object(OpenAIChat, 'invoke', return_value=make_completion("<h1>Chart</h1>")) as mock_invoke:
+        first_response = model.invoke(messages)
+        second_response = model.invoke(messages)
+
+        mock_invoke.assert_called_once()
+        assert second_response.choices[0].message.content == first_response.choices[0].message.content
+
+def test_cached_model_replay_miss(db_file):
+    model = CachedOpenAIChat(id="gpt-4o", cache=LLMCache(db_file=db_file, mode="replay"))
+
+    with patch.object(OpenAIChat, 'invoke') as mock_invoke:
+        with pytest.raises(LLMCacheMiss):
+            model.invoke([Message(role="user", content="Not recorded")])
+        mock_invoke.assert_not_called()
+
+def test_cached_model_off_in_cache_mode(db_file):
+    # Agents working on live data are not cached in cache mode...
+    cache = LLMCache(db_file=db_file)
+    model = CachedOpenAIChat(id="gpt-4o", cache=cache, cache_mode="off")
+    messages = [Message(role="user", content="Latest news about AAPL")]
+
+    with patch.object(OpenAIChat, 'invoke', return_value=make_completion("News")) as mock_invoke:
+        model.invoke(messages)
+        model.invoke(messages)
+        assert mock_invoke.call_count == 2
+
+    # ...but they are recorded and replayed with the others
+    record_model = CachedOpenAIChat(id="gpt-4o", cache=LLMCache(db_file=db_file, mode="record"), cache_mode="off")
+    with patch.object(OpenAIChat, 'invoke', return_value=make_completion("News")):
+        record_model.invoke(messages)
+
+    replay_model = CachedOpenAIChat(id="gpt-4o", cache=LLMCache(db_file=db_file, mode="replay"), cache_mode="off")
+    with patch.object(OpenAIChat, 'invoke') as mock_invoke:
+        assert replay_model.invoke(messages).choices[0].message.content == "News"
+        mock_invoke.assert_not_called()
+
+def make_tool_call_completion(name: str, arguments: str) -> ChatCompletion:
+    return ChatCompletion.model_validate({
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o",
+        "choices": [{
+            "index": 0,
+            "finish_reason": "tool_calls",
+            "message": {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{"id": "call_1", "type": "function", "function": {"name": name, "arguments": arguments}}],
+            },
+        }],
+    })
+
+def test_record_and_replay_tool_calling_agent(db_file):
+    """
+    Records a run of an agent calling a cached tool, then replays it without the model nor the live data.
+    """
+    live_prices = MagicMock(return_value='{"2023-01-04": 125.0}')
+
+    def get_historical_prices(symbol: str, period: int = 6) -> str:
+        "Get the historical prices of a stock"
+        return live_prices(symbol, period)
+
+    def create_agent(mode: str) -> Agent:
+        cache = DataCache(table_name="prices", ttl=60, db_file=db_file, mode=mode)
+        return Agent(
+            model=CachedOpenAIChat(id="gpt-4o", cache=LLMCache(db_file=db_file, mode=mode), cache_mode="off"),
+            tools=[cached_tool(get_historical_prices, cache)],
+        )
+
+    model_responses = [
+        make_tool_call_completion("get_historical_prices", '{"symbol": "AAPL", "period": 3}'),
+        make_completion("AAPL closed at 125"),
+    ]
+    with patch.object(OpenAIChat, 'invoke', side_effect=model_responses):
+        recorded = create_agent("record").run("Get the prices of AAPL").content
+    live_prices.assert_called_once_with("AAPL", 3)
+
+    # The live data changed since the recording, the replay must not see it
+    live_prices.reset_mock()
+    live_prices.return_value = '{"2023-01-04": 999.0}'
+    with patch.object(OpenAIChat, 'invoke') as mock_invoke:
+        replayed = create_agent("replay").run("Get the prices of AAPL").content
+
+    mock_invoke.assert_not_called()
+    live_prices.assert_not_called()
+    assert replayed == recorded == "AAPL closed at 125"
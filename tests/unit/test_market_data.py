@@ -0,0 +1,112 @@
+import json
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+from src.ai_finance_agent_team.market_data import (
+    YFinanceProvider, LocalFileProvider, SyntheticProvider, create_market_data_provider, resample, PRICE_COLUMNS,
+    MARKET_TIMEZONE
+)
+
+
+@pytest.fixture
+def synthetic_provider():
+    return SyntheticProvider(end="2025-05-09")
+
+@pytest.fixture
+def market_data_dir(tmp_path, synthetic_provider):
+    """Directory with the daily prices of AAPL as parquet and MSFT as csv."""
+    LocalFileProvider.write_parquet(synthetic_provider.daily_prices("AAPL", "2y"), str(tmp_path / "AAPL.parquet"))
+    synthetic_provider.daily_prices("MSFT", "2y").to_csv(tmp_path / "MSFT.csv")
+    return tmp_path
+
+def test_synthetic_provider_is_deterministic(synthetic_provider):
+    prices = synthetic_provider.history("AAPL", period="6mo", interval="1d")
+
+    assert list(prices.columns) == PRICE_COLUMNS
+    assert prices.index.min() >= pd.Timestamp("2024-11-09", tz="America/New_York")
+    assert prices.index.max() == pd.Timestamp("2025-05-09", tz="America/New_York")
+    assert (prices["High"] >= prices["Low"]).all()
+    pd.testing.assert_frame_equal(prices, SyntheticProvider(end="2025-05-09").history("AAPL", period="6mo", interval="1d"))
+    assert not prices["Close"].equals(synthetic_provider.history("MSFT", period="6mo", interval="1d")["Close"])
+
+def test_synthetic_provider_periods_are_consistent(synthetic_provider):
+    one_month = synthetic_provider.history("AAPL", period="1mo", interval="1d")
+    one_year = synthetic_provider.history("AAPL", period="1y", interval="1d")
+
+    pd.testing.assert_frame_equal(one_month, one_year.loc[one_month.index])
+
+def test_resample_weekly(synthetic_provider):
+    daily = synthetic_provider.history("AAPL", period="1mo", interval="1d")
+    weekly = resample(daily, "1wk")
+
+    assert (weekly.index.dayofweek == 0).all()
+    first_week = daily[daily.index < weekly.index[1]]
+    assert weekly["Close"].iloc[0] == first_week["Close"].iloc[-1]
+    assert weekly["High"].iloc[0] == first_week["High"].max()
+    assert weekly["Volume"].iloc[0] == first_week["Volume"].sum()
+
+@pytest.mark.parametrize("symbol", ["AAPL", "MSFT", "msft"])
+def test_local_file_provider(market_data_dir, synthetic_provider, symbol):
+    provider = LocalFileProvider(str(market_data_dir))
+
+    prices = provider.history(symbol, period="3mo", interval="1d")
+    expected = synthetic_provider.history(symbol, period="3mo", interval="1d")
+
+    assert list(prices.columns) == PRICE_COLUMNS
+    assert list(prices.index) == list(expected.index)
+    assert prices["Close"].tolist() == pytest.approx(expected["Close"].tolist())
+
+@pytest.mark.parametrize("extension", ["csv", "parquet"])
+def test_local_file_provider_naive_dates(tmp_path, synthetic_provider, extension):
+    """
+    Plain dates (without time nor UTC offset) are market dates: the bars stay on their day and in their week.
+    """
+    daily = synthetic_provider.daily_prices("NVDA", "3mo")
+    naive = daily.copy()
+    naive.index = naive.index.tz_localize(None).normalize()
+    naive.index.name = "Date"
+    if extension == "csv":
+        naive.to_csv(tmp_path / "NVDA.csv", date_format="%Y-%m-%d")
+    else:
+        naive.reset_index().to_parquet(tmp_path / "NVDA.parquet", index=False)
+    provider = LocalFileProvider(str(tmp_path))
+
+    prices = provider.history("NVDA", period="1mo", interval="1d")
+    assert str(prices.index.tz) == MARKET_TIMEZONE
+    assert (prices.index == prices.index.normalize()).all()
+    assert prices.index.max() == daily.index.max()
+
+    weekly = provider.history("NVDA", period="3mo", interval="1wk")
+    expected = resample(daily[daily.index >= weekly.index.min()], "1wk")
+    assert list(weekly.index) == list(expected.index)
+    assert weekly["Close"].tolist() == pytest.approx(expected["Close"].tolist())
+
+def test_local_file_provider_missing_symbol(market_data_dir):
+    with pytest.raises(FileNotFoundError):
+        LocalFileProvider(str(market_data_dir)).history("NVDA", period="3mo", interval="1d")
+
+def test_create_market_data_provider(monkeypatch, tmp_path):
+    assert isinstance(create_market_data_provider(), YFinanceProvider)
+
+    monkeypatch.setenv("MARKET_DATA_PROVIDER", "local")
+    monkeypatch.setenv("MARKET_DATA_DIR", str(tmp_path))
+    provider = create_market_data_provider()
+    assert isinstance(provider, LocalFileProvider)
+    assert provider.directory == str(tmp_path)
+
+    assert isinstance(create_market_data_provider("synthetic"), SyntheticProvider)
+    with pytest.raises(ValueError):
+        create_market_data_provider("unknown")
+
+def test_get_historical_prices_offline(synthetic_provider):
+    """
+    Tests get_historical_prices without network access, with the synthetic provider.
+    """
+    from src.ai_finance_agent_team.tools import get_historical_prices
+
+    with patch('src.ai_finance_agent_team.tools.get_market_data_provider', return_value=synthetic_provider):
+        result_data = json.loads(get_historical_prices("AAPL", 6))
+
+    assert len(result_data) > 20
+    assert all(set(PRICE_COLUMNS) <= set(row) for row in result_data.values())
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ai_finance_agent_team.price_frame import (
+    align, to_frame, frame_from_json, frame_from_histories, to_financial_data, to_chart_data, rebase, returns,
+    comparison_summary
+)
+from src.ai_finance_agent_team.tools import FinancialDataResponse, FinancialDataList, DayFinancialData, StockMetric
+
+
+def make_financial_data(company, closes_by_date):
+    return FinancialDataList(company_name=company, financial_data=[
+        DayFinancialData(date=date, metrics=StockMetric(Close=close)) for date, close in closes_by_date.items()
+    ])
+
+@pytest.fixture
+def financial_data_response():
+    """Two companies with a date missing for Microsoft and a different date format."""
+    return FinancialDataResponse(companies_financial_data=[
+        make_financial_data("Apple", {"2023-01-01": 100.0, "2023-01-08": 110.0, "2023-01-15": 121.0}),
+        make_financial_data("Microsoft", {"2023-01-01T00:00:00Z": 200.0, "2023-01-15T00:00:00Z": 180.0}),
+    ])
+
+def test_to_frame_shared_date_index(financial_data_response):
+    frame = to_frame(financial_data_response, fill="none")
+
+    assert list(frame.columns) == ["Apple", "Microsoft"]
+    assert list(frame.index) == list(pd.to_datetime(["2023-01-01", "2023-01-08", "2023-01-15"]))
+    assert frame.loc["2023-01-15", "Microsoft"] == 180.0
+    assert np.isnan(frame.loc["2023-01-08", "Microsoft"])
+
+def test_fill_policies(financial_data_response):
+    assert to_frame(financial_data_response).loc["2023-01-08", "Microsoft"] == 200.0
+    assert len(to_frame(financial_data_response, fill="drop")) == 2
+    with pytest.raises(ValueError):
+        align(to_frame(financial_data_response), fill="invalid")
+
+def test_frame_from_json_matches_pydantic(financial_data_response):
+    frame = frame_from_json(financial_data_response.model_dump_json())
+
+    pd.testing.assert_frame_equal(frame, to_frame(financial_data_response))
+
+def test_frame_from_histories():
+    index = pd.DatetimeIndex(["2023-01-02", "2023-01-03"], tz="America/New_York")
+    histories = {
+        "AAPL": pd.DataFrame({"Open": [1.0, 2.0], "Close": [125.0, 126.0]}, index=index),
+        "MSFT": pd.DataFrame({"Open": [1.0], "Close": [240.0]}, index=index[:1]),
+    }
+
+    frame = frame_from_histories(histories)
+
+    assert list(frame.index) == list(pd.to_datetime(["2023-01-02", "2023-01-03"]))
+    assert list(frame["AAPL"]) == [125.0, 126.0]
+    assert list(frame["MSFT"]) == [240.0, 240.0]
+
+def test_to_frame_free_form_dates():
+    # The dates are written by the finance agent, the ones that cannot be parsed are dropped
+    financial_data = [make_financial_data("Apple", {"Jan 4, 2023": 100.0, "2023-01-05": 101.0, "not a date": 102.0})]
+
+    frame = to_frame(financial_data)
+
+    assert list(frame.index) == list(pd.to_datetime(["2023-01-04", "2023-01-05"]))
+    assert list(frame["Apple"]) == [100.0, 101.0]
+
+def test_to_frame_mixed_utc_offsets():
+    financial_data = [make_financial_data("Apple", {"2023-03-10T00:00:00-05:00": 100.0, "2023-03-13T00:00:00-04:00": 101.0})]
+
+    assert list(to_frame(financial_data).index) == list(pd.to_datetime(["2023-03-10", "2023-03-13"]))
+
+def test_frame_from_histories_keeps_exchange_date():
+    # Midnight in Tokyo is the previous day in UTC, the bar keeps its local date
+    index = pd.DatetimeIndex(["2023-01-04", "2023-01-05"], tz="Asia/Tokyo")
+    histories = {"7203.T": pd.DataFrame({"Close": [1800.0, 1810.0]}, index=index)}
+
+    frame = frame_from_histories(histories)
+
+    assert list(frame.index) == list(pd.to_datetime(["2023-01-04", "2023-01-05"]))
+
+def test_to_financial_data_roundtrip(financial_data_response):
+    response = to_financial_data(to_frame(financial_data_response, fill="none"))
+
+    apple, microsoft = response.companies_financial_data
+    assert apple.company_name == "Apple"
+    assert [day.date for day in apple.financial_data] == ["2023-01-01", "2023-01-08", "2023-01-15"]
+    assert [day.metrics.Close for day in apple.financial_data] == [100.0, 110.0, 121.0]
+    # The missing values are skipped
+    assert [day.date for day in microsoft.financial_data] == ["2023-01-01", "2023-01-15"]
+
+def test_to_chart_data(financial_data_response):
+    data = to_chart_data(to_frame(financial_data_response, fill="none"))
+
+    assert data == (
+        '{"dates": ["2023-01-01", "2023-01-08", "2023-01-15"], '
+        '"series": {"Apple": [100.0, 110.0, 121.0], "Microsoft": [200.0, null, 180.0]}}'
+    )
+
+def test_rebase_and_returns(financial_data_response):
+    frame = to_frame(financial_data_response)
+
+    rebased = rebase(frame)
+    assert list(rebased["Apple"].round(6)) == [100.0, 110.0, 121.0]
+    assert list(rebased["Microsoft"].round(6)) == [100.0, 100.0, 90.0]
+
+    assert list(returns(frame)["Apple"].round(6))[1:] == [0.1, 0.1]
+
+def test_comparison_summary(financial_data_response):
+    summary = comparison_summary(to_frame(financial_data_response, fill="none"))
+
+    assert summary.loc["Apple", "first_close"] == 100.0
+    assert summary.loc["Apple", "last_close"] == 121.0
+    assert summary.loc["Apple", "change_pct"] == pytest.approx(21.0)
+    assert summary.loc["Microsoft", "change_pct"] == pytest.approx(-10.0)
+    assert summary.loc["Microsoft", "max_close"] == 200.0
+    assert summary.loc["Apple", "volatility_pct"] == pytest.approx(0.0)
@@ -0,0 +1,78 @@
+import os
+import gzip
+import pytest
+
+from src.ai_finance_agent_team.report_store import ReportStore, ReportTooLargeError
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReportStore(directory=str(tmp_path), max_reports=3, max_total_bytes=10**6, max_html_bytes=10**5)
+
+
+def test_put_and_read_roundtrip(store):
+    html = "<html><body><h1>Report</h1></body></html>"
+    report_id = store.put(html)
+
+    assert store.exists(report_id)
+    assert store.read(report_id) == html
+
+    # The report is stored gzip compressed on disk
+    path = os.path.join(store.directory, report_id + ".html.gz")
+    with gzip.open(path, "rb") as f:
+        assert f.read().decode("utf-8") == html
+
+def test_put_same_content_is_deduplicated(store):
+    first_id = store.put("<p>same</p>")
+    second_id = store.put("<p>same</p>")
+
+    assert first_id == second_id
+    assert len(os.listdir(store.directory)) == 1
+
+def test_open_streams_report(store):
+    report_id = store.put("<p>stream</p>")
+
+    with store.open(report_id) as f:
+        assert f.read() == b"<p>stream</p>"
+
+def test_put_report_too_large(store):
+    with pytest.raises(ReportTooLargeError):
+        store.put("x" * (store.max_html_bytes + 1))
+
+def test_read_unknown_or_invalid_id(store):
+    with pytest.raises(KeyError):
+        store.read("0" * 32)
+    with pytest.raises(KeyError):
+        store.read("../team_database")
+    assert not store.exists("../team_database")
+
+def test_lru_eviction_by_count(store):
+    ids = [store.put(f"<p>report {i}</p>") for i in range(3)]
+    # Make the first report the most recently used one
+    for report_id, mtime in zip(ids, [10**10, 100, 200]):
+        os.utime(os.path.join(store.directory, report_id + ".html.gz"), (mtime, mtime))
+
+    new_id = store.put("<p>report 3</p>")
+
+    assert store.exists(new_id)
+    assert store.exists(ids[0])
+    assert not store.exists(ids[1])
+    assert store.exists(ids[2])
+
+def test_eviction_by_size_keeps_new_report(tmp_path):
+    store = ReportStore(directory=str(tmp_path), max_reports=100, max_total_bytes=1, max_html_bytes=10**5)
+    old_id = store.put("<p>old</p>")
+    new_id = store.put("<p>new</p>")
+
+    assert not store.exists(old_id)
+    assert store.exists(new_id)
+
+def test_directory_created_on_first_put(tmp_path):
+    store = ReportStore(directory=str(tmp_path / "reports"))
+
+    assert not os.path.exists(store.directory)
+    assert store.total_bytes() == 0
+    assert not store.exists("0123abcd")
+
+    store.put("<p>first</p>")
+    assert os.path.isdir(store.directory)
@@ -4,7 +4,7 @@ from unittest.mock import patch, MagicMock
 import json
 from datetime import datetime
 
-from src.ai_finance_agent_team.tools import get_historical_prices, FinancialDataResponse, FinancialDataList, DayFinancialData, StockMetric, News, NewsList, NewsResponse, FrontEndResponse, ManagerResponse
+from src.ai_finance_agent_team.tools import get_historical_prices, CachedDuckDuckGoTools, FinancialDataResponse, FinancialDataList, DayFinancialData, StockMetric, News, NewsList, NewsResponse, FrontEndResponse, ManagerResponse
 
 @pytest.fixture
 def mock_stock_data():
@@ -31,7 +31,7 @@ def test_get_historical_prices_success(mock_stock_data):
     mock_ticker_instance = MagicMock()
     mock_ticker_instance.history.return_value = mock_stock_data
 
-    with patch('src.ai_finance_agent_team.tools.yf.Ticker', return_value=mock_ticker_instance) as mock_yf_ticker:
+    with patch('src.ai_finance_agent_team.market_data.yf.Ticker', return_value=mock_ticker_instance) as mock_yf_ticker:
         symbol = "AAPL"
         period = 6 # Corresponds to "6mo"
 
@@ -64,7 +64,7 @@ def test_get_historical_prices_yfinance_error():
     mock_ticker_instance = MagicMock()
     mock_ticker_instance.history.side_effect = Exception("Test yfinance error")
 
-    with patch('src.ai_finance_agent_team.tools.yf.Ticker', return_value=mock_ticker_instance) as mock_yf_ticker:
+    with patch('src.ai_finance_agent_team.market_data.yf.Ticker', return_value=mock_ticker_instance) as mock_yf_ticker:
         symbol = "FAIL"
         period = 1
 
@@ -84,6 +84,23 @@ def test_get_historical_prices_invalid_period():
     with pytest.raises(KeyError): # Expecting KeyError from period_mapping[invalid_period]
         get_historical_prices(symbol, invalid_period)
 
+def test_cached_duckduckgo_tools(tmp_path):
+    """
+    Tests that CachedDuckDuckGoTools only searches DuckDuckGo on cache misses and on refresh.
+    """
+    from src.ai_finance_agent_team.data_cache import DataCache
+
+    news_cache = DataCache(table_name="news", ttl=60, db_file=str(tmp_path / "data_cache.db"))
+    web_tools = CachedDuckDuckGoTools(cache=news_cache)
+
+    with patch('src.ai_finance_agent_team.tools.DuckDuckGoTools.duckduckgo_news', return_value='[{"title": "News"}]') as mock_news:
+        assert web_tools.duckduckgo_news("Apple") == '[{"title": "News"}]'
+        assert web_tools.duckduckgo_news("Apple", max_results=5) == '[{"title": "News"}]'
+        mock_news.assert_called_once_with(query="Apple", max_results=5)
+
+        web_tools.refresh("duckduckgo_news", query="Apple")
+        assert mock_news.call_count == 2
+
 # --- Pydantic Model Unit Tests ---
 
 def test_stock_metric_valid():
@@ -0,0 +1,117 @@
+import json
+import sqlite3
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+from src.ai_finance_agent_team.warmup import (
+    load_watchlist, mine_tool_calls, build_tasks, warm_up, WarmupScheduler
+)
+
+
+@pytest.fixture
+def agents_db(tmp_path):
+    """Agents storage with past finance and web agent runs, in agno and OpenAI tool calls formats."""
+    db_file = str(tmp_path / "team_database.db")
+    finance_memory = {
+        "runs": [{"response": {"tools": [
+            {"tool_name": "get_historical_prices", "tool_args": {"symbol": "AAPL", "period": 3}},
+        ]}}] * 3 + [{"response": {"tools": [
+            {"tool_name": "get_historical_prices", "tool_args": {"symbol": "MSFT", "period": 6}},
+        ]}}]
+    }
+    web_memory = {
+        "messages": [{"role": "assistant", "tool_calls": [
+            {"type": "function", "function": {"name": "duckduckgo_news", "arguments": json.dumps({"query": "Apple news"})}},
+            {"type": "function", "function": {"name": "unknown_tool", "arguments": "{}"}},
+        ]}]
+    }
+    conn = sqlite3.connect(db_file)
+    with conn:
+        for table, memory in [("finance_agent", finance_memory), ("web_agent", web_memory)]:
+            conn.execute(f"CREATE TABLE {table} (session_id TEXT, memory TEXT)")
+            conn.execute(f"INSERT INTO {table} VALUES (?, ?)", ("session", json.dumps(memory)))
+    conn.close()
+    return db_file
+
+def test_load_watchlist(tmp_path):
+    watchlist_file = tmp_path / "watchlist.txt"
+    watchlist_file.write_text("# Popular tickers\nAAPL\n\n  MSFT  \nNVDA\n")
+
+    assert load_watchlist(str(watchlist_file)) == ["AAPL", "MSFT", "NVDA"]
+
+def test_mine_tool_calls(agents_db):
+    tool_calls = mine_tool_calls(agents_db)
+
+    assert tool_calls[0] == ("get_historical_prices", {"symbol": "AAPL", "period": 3})
+    assert ("get_historical_prices", {"symbol": "MSFT", "period": 6}) in tool_calls
+    assert ("duckduckgo_news", {"query": "Apple news"}) in tool_calls
+    assert all(name != "unknown_tool" for name, _ in tool_calls)
+
+    assert mine_tool_calls(agents_db, limit=1) == [("get_historical_prices", {"symbol": "AAPL", "period": 3})]
+
+def test_mine_tool_calls_missing_db(tmp_path):
+    assert mine_tool_calls(str(tmp_path / "missing.db")) == []
+
+def test_build_tasks_removes_duplicates(agents_db):
+    tasks = build_tasks(["AAPL"], periods=[3, 6], db_file=agents_db)
+
+    assert tasks[:2] == [
+        ("get_historical_prices", {"symbol": "AAPL", "period": 3}),
+        ("get_historical_prices", {"symbol": "AAPL", "period": 6}),
+    ]
+    assert tasks.count(("get_historical_prices", {"symbol": "AAPL", "period": 3})) == 1
+    assert ("get_historical_prices", {"symbol": "MSFT", "period": 6}) in tasks
+    # The news searches come from the queries the agent sent, not from the watchlist tickers
+    assert ("duckduckgo_news", {"query": "Apple news"}) in tasks
+    assert not any(name == "duckduckgo_news" and arguments["query"] == "AAPL" for name, arguments in tasks)
+
+def test_warm_up_refreshes_caches():
+    tasks = [
+        ("get_historical_prices", {"symbol": "AAPL", "period": 3}),
+        ("duckduckgo_news", {"query": "AAPL", "max_results": 5}),
+        ("get_historical_prices", {"symbol": "FAIL", "period": 3}),
+    ]
+
+    def refresh_prices(symbol, period):
+        if symbol == "FAIL":
+            raise ValueError("Error fetching historical data")
+        return "{}"
+
+    with patch('src.ai_finance_agent_team.warmup.cached_get_historical_prices') as mock_prices, \
+         patch('src.ai_finance_agent_team.warmup.web_tools') as mock_web_tools:
+        mock_prices.refresh.side_effect = refresh_prices
+
+        assert warm_up(tasks, max_workers=2) == 2
+
+        mock_prices.refresh.assert_any_call(symbol="AAPL", period=3)
+        mock_web_tools.refresh.assert_called_once_with("duckduckgo_news", query="AAPL", max_results=5)
+
+def test_scheduler_next_run():
+    scheduler = WarmupScheduler(at="09:00", timezone="America/New_York")
+    new_york = ZoneInfo("America/New_York")
+
+    # Wednesday before the warm-up time: same day
+    assert scheduler.next_run(datetime(2025, 5, 7, 8, 0, tzinfo=new_york)) == datetime(2025, 5, 7, 9, 0, tzinfo=new_york)
+    # Wednesday after the warm-up time: next day
+    assert scheduler.next_run(datetime(2025, 5, 7, 10, 0, tzinfo=new_york)) == datetime(2025, 5, 8, 9, 0, tzinfo=new_york)
+    # Friday after the warm-up time: skip the week-end
+    assert scheduler.next_run(datetime(2025, 5, 9, 10, 0, tzinfo=new_york)) == datetime(2025, 5, 12, 9, 0, tzinfo=new_york)
+
+def test_scheduler_stop():
+    scheduler = WarmupScheduler()
+    scheduler.start()
+    scheduler.stop()
+    scheduler.join(timeout=5)
+
+    assert not scheduler.is_alive()
+
+def test_scheduler_survives_failed_warm_up_on_start(tmp_path):
+    scheduler = WarmupScheduler(watchlist_file=str(tmp_path / "missing.txt"), db_file=None, run_on_start=True)
+    scheduler.start()
+    scheduler.join(timeout=1)
+
+    assert scheduler.is_alive()
+    scheduler.stop()
+    scheduler.join(timeout=5)